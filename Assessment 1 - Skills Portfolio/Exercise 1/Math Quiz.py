@@ -1,221 +1,427 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Shared"))
+import Startup  # first, so --profile-startup times the imports below
+
 import tkinter as tk
 from tkinter import messagebox
-import random
-
-# ================= Helper Functions ================= #
+import getpass
+import time
 
-def randomInt(level):
-    return random.randint(1, 9) if level == "easy" else random.randint(10, 99) if level == "moderate" else random.randint(1000, 9999)
+from QuizEngine import QUESTIONS, TIME_LIMIT, QuizEngine
+from QuizResults import QuizResults
+from RoundedSprites import RoundedBar
 
-def decideOperation():
-    return random.choice(["+", "-"])
+# ================= Helper Functions ================= #
 
 def darker_color(hex_color):
     hex_color = hex_color.lstrip('#')
     rgb = tuple(max(int(int(hex_color[i:i + 2], 16) * 0.85), 0) for i in (0, 2, 4))
     return f"#{rgb[0]:02x}{rgb[1]:02x}{rgb[2]:02x}"
 
-def draw_rounded_bar(canvas, x, y, bar_width, height, fill, tag=None):
-    """Draw rounded progress/timer bar without outlines."""
-    r = height // 2
-    parts = []
-    parts.append(canvas.create_oval(x, y, x + height, y + height,
-                                    fill=fill, outline="", tag=tag))
-    parts.append(canvas.create_oval(x + bar_width - height, y, x + bar_width, y + height,
-                                    fill=fill, outline="", tag=tag))
-    parts.append(canvas.create_rectangle(x + r, y, x + bar_width - r, y + height,
-                                         fill=fill, outline="", tag=tag))
-    return parts
+def draw_rounded_bar(canvas, x, y, bar_width, height, fill, value=None, bg=None):
+    """Draw rounded progress/timer bar as one image item; resize it with .set().
+
+    bg is the colour the bar sits on: the canvas, or the trough under it.
+    """
+    return RoundedBar(canvas, x, y, bar_width, height, fill, bg=bg or canvas["bg"], value=value)
+
+# ================= Countdown Timer ================= #
+
+class CountdownTimer:
+    """Drives the timer bar from the wall clock instead of counting ticks.
+
+    The bar is created once and only resized/recoloured. Time left
+    is always deadline - time.monotonic(), so a late tick never makes the
+    countdown drift, and the next tick is scheduled for when the bar next
+    loses a pixel or the label next changes, not every 100 ms.
+    """
+
+    MIN_DELAY = 15   # ms, about one frame
+    MAX_DELAY = 250  # ms, so a stalled clock is noticed quickly
+    COLOR_STEPS = 16  # green to red in this many steps: one cached bar sprite each
+
+    def __init__(self, canvas, width, height, duration, on_expire):
+        self.canvas = canvas
+        self.width = width
+        self.height = height
+        self.duration = duration
+        self.on_expire = on_expire
+        self.trough = draw_rounded_bar(canvas, 0, 0, width, height, fill="#dddddd")
+        self.bar = draw_rounded_bar(canvas, 0, 0, width, height, fill="#00ff00", bg="#dddddd")
+        self.text = canvas.create_text(width // 2, height // 2, text=f"{duration}s", fill="black",
+                                       font=("Helvetica", 12, "bold"))
+        self.job = None
+        self.deadline = None
+        self.due = None
+        self.shown = (None, None, None)  # bar width, colour, label
+
+    def start(self):
+        self.stop()
+        self.deadline = time.monotonic() + self.duration
+        self.due = time.monotonic()
+        self.tick()
+
+    def stop(self):
+        if self.job is not None:
+            self.canvas.after_cancel(self.job)
+            self.job = None
+
+    def remaining(self):
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    def tick(self):
+        self.job = None
+        started = time.monotonic()
+        timer_stats.jitter(started - self.due)
+        left = self.deadline - started
+
+        if left <= 0:
+            self.draw(0, "#ff0000", "0s")
+            timer_stats.frame(time.monotonic() - started)
+            self.on_expire()
+            return
+
+        fraction = left / self.duration
+        shade = round(fraction * self.COLOR_STEPS) / self.COLOR_STEPS
+        color = f"#{int(255 * (1 - shade)):02x}{int(255 * shade):02x}00"
+        self.draw(int(self.width * fraction), color, f"{int(left)}s")
+
+        # Sleep until the bar next shrinks a pixel or the label next changes.
+        pixel_left = int(self.width * fraction) * self.duration / self.width
+        next_change = max(pixel_left, float(int(left)))
+        delay = int((left - next_change) * 1000) + 1
+        delay = min(max(delay, self.MIN_DELAY), self.MAX_DELAY)
+        now = time.monotonic()
+        timer_stats.frame(now - started)
+        self.due = now + delay / 1000
+        self.job = self.canvas.after(delay, self.tick)
+
+    def draw(self, width, color, label):
+        bar, fill, text = self.shown
+        if (width, color) != (bar, fill):
+            self.bar.set(width, color)
+        if label != text:
+            self.canvas.itemconfig(self.text, text=label)
+        self.shown = (width, color, label)
+
+class TimerStats:
+    """How late ticks fire (jitter) and how long each redraw takes."""
+
+    def __init__(self):
+        self.ticks = 0
+        self.jitter_total = self.jitter_max = 0.0
+        self.frame_total = self.frame_max = 0.0
+
+    def jitter(self, seconds):
+        self.ticks += 1
+        self.jitter_total += seconds
+        self.jitter_max = max(self.jitter_max, seconds)
+
+    def frame(self, seconds):
+        self.frame_total += seconds
+        self.frame_max = max(self.frame_max, seconds)
+
+    def report(self):
+        ticks = self.ticks or 1
+        return (f"timer ticks: {self.ticks}, "
+                f"jitter mean {self.jitter_total / ticks * 1000:.2f} ms / max {self.jitter_max * 1000:.2f} ms, "
+                f"frame cost mean {self.frame_total / ticks * 1000:.3f} ms / max {self.frame_max * 1000:.3f} ms")
+
+timer_stats = TimerStats()
 
 # ================= Core Game Logic ================= #
 
 def displayMenu():
-    clear_overlay()
-    overlay.config(bg="#ffffff")
-    tk.Label(overlay, text="Select Difficulty Level", font=("Helvetica", 18, "bold"), bg="#ffffff").pack(pady=20)
-    for level, text in [("easy", "Easy (1-digit)"), ("moderate", "Moderate (2-digit)"), ("advanced", "Advanced (4-digit)")]:
-        btn = tk.Button(overlay, text=text, width=20, font=("Helvetica", 14, "bold"),
-                        bg="#4caf50", fg="white", activebackground="#45a049",
-                        command=lambda l=level: start_quiz(l))
-        btn.pack(pady=8)
-        btn.bind("<Enter>", lambda e, b=btn: b.config(bg="#45a049"))
-        btn.bind("<Leave>", lambda e, b=btn: b.config(bg="#4caf50"))
+    stop_timer()
+    show_screen("menu")
 
 def displayProblem():
-    global num1, num2, operation, answer_entry, attempt, timer, timer_canvas, timer_bar_parts, timer_job
-
-    clear_overlay()
-
-    operation = decideOperation()
-    num1 = randomInt(difficulty)
-    num2 = randomInt(difficulty)
-    attempt = 1
-    if operation == "-" and num1 < num2:
-        num1, num2 = num2, num1
-
-    tk.Label(overlay, text=f"Question {question_number}/10", font=("Helvetica", 16, "bold"), bg="#ffffff").pack(pady=(10, 5))
-
-    # Grey progress bar (top)
-    progress_canvas = tk.Canvas(overlay, width=300, height=20, bg="#ffffff", highlightthickness=0)
-    progress_canvas.pack(pady=(0, 15))
-    draw_rounded_bar(progress_canvas, 0, 0, 300, 20, fill="#eeeeee")
-    progress_width = int((question_number - 1) / 10 * 300)
-    draw_rounded_bar(progress_canvas, 0, 0, progress_width, 20, fill="#9e9e9e")
-
-    # Problem text
-    tk.Label(overlay, text=f"{num1} {operation} {num2} =", font=("Helvetica", 30, "bold"), bg="#ffffff", fg="#333333").pack(pady=10)
-
-    # Answer entry
-    answer_entry = tk.Entry(overlay, font=("Helvetica", 16), justify="center", bd=2, relief="groove")
-    answer_entry.pack(pady=10)
+    # Only the text, progress bar and timer change between questions.
+    question_label.config(text=f"Question {quiz.question_number}/{QUESTIONS}")
+    progress_bar.set(int(quiz.progress() * 300))
+    problem_label.config(text=str(quiz.problem))
+    answer_entry.delete(0, "end")
+    show_screen("question")
     answer_entry.focus()
+    countdown.start()
 
-    # Submit + menu buttons
-    submit_btn = tk.Button(
-        overlay, text="Submit Answer", font=("Helvetica", 14, "bold"),
-        bg="#2196f3", fg="white", activebackground="#1976d2", command=check_answer
-    )
-    submit_btn.pack(pady=10)
+    if submitted_at is not None:
+        overlay.after_idle(record_latency)
 
-    menu_btn = tk.Button(overlay, text="Back to Menu", font=("Helvetica", 12),
-                         bg="#ff9800", fg="white", command=displayMenu)
-    menu_btn.pack(pady=5)
+def stop_timer():
+    if countdown is not None:
+        countdown.stop()
 
-    # Timer
-    timer_canvas = tk.Canvas(overlay, width=300, height=30, bg="#ffffff", highlightthickness=0)
-    timer_canvas.pack(pady=15)
-    draw_rounded_bar(timer_canvas, 0, 0, 300, 30, fill="#dddddd")
-    timer_bar_parts = draw_rounded_bar(timer_canvas, 0, 0, 300, 30, fill="#4caf50", tag="bar")
-    timer_canvas.create_text(150, 15, text="60s", fill="black", font=("Helvetica", 12, "bold"), tag="timer_text")
-
-    global timer
-    timer = 60
-    countdown_bar()
-
-def countdown_bar():
-    global timer, timer_job
-    if timer > 0:
-        red = int(255 * (1 - timer / 60))
-        green = int(255 * (timer / 60))
-        color = f'#{red:02x}{green:02x}00'
-
-        width = int(300 * (timer / 60))
-        timer_canvas.delete("bar")
-        draw_rounded_bar(timer_canvas, 0, 0, width, 30, fill=color, tag="bar")
-        timer_canvas.itemconfig("timer_text", text=f"{int(timer)}s")
-
-        timer -= 0.1
-        timer_job = overlay.after(100, countdown_bar)
-    else:
-        timer_canvas.delete("bar")
-        draw_rounded_bar(timer_canvas, 0, 0, 0, 30, fill="#ff0000", tag="bar")
-        timer_canvas.itemconfig("timer_text", text="0s")
-        messagebox.showinfo("Time's Up!", "⏰ Time is up! Moving to next question.")
-        next_question()
-
-def isCorrect(user_answer):
-    return user_answer == (num1 + num2 if operation == "+" else num1 - num2)
+def time_up():
+    quiz.time_up()
+    messagebox.showinfo("Time's Up!", "⏰ Time is up! Moving to next question.")
+    next_question()
 
 def check_answer():
-    global score, question_number, attempt, timer
     try:
         user_answer = int(answer_entry.get())
     except ValueError:
         messagebox.showwarning("Invalid", "Please enter a number.")
         return
 
-    if isCorrect(user_answer):
-        points = 10 if attempt == 1 else 5
-        score += points
-        messagebox.showinfo("Correct!", f"✅ Correct! +{points} points")
-        timer = 0
-        next_question()
+    outcome = quiz.submit(user_answer)
+    if not outcome.moved_on:
+        messagebox.showinfo("Incorrect", "❌ Wrong! Try again.")
+        return
+    stop_timer()
+    if outcome.correct:
+        messagebox.showinfo("Correct!", f"✅ Correct! +{outcome.points} points")
     else:
-        if attempt == 1:
-            attempt += 1
-            messagebox.showinfo("Incorrect", "❌ Wrong! Try again.")
-        else:
-            messagebox.showinfo("Incorrect", "❌ Wrong again! Moving to next question.")
-            timer = 0
-            next_question()
+        messagebox.showinfo("Incorrect", "❌ Wrong again! Moving to next question.")
+    submitted()
+    next_question()
 
 def next_question():
-    global question_number, timer
-    question_number += 1
-    timer = 60
-    if question_number > 10:
+    if quiz.advance() is None:
         displayResults()
     else:
         displayProblem()
 
 def displayResults():
-    clear_overlay()
-    overlay.config(bg="#ffffff")
-    rank = "A+" if score >= 90 else "A" if score >= 80 else "B" if score >= 70 else "C" if score >= 60 else "Needs Improvement"
-    tk.Label(overlay, text="Quiz Complete!", font=("Helvetica", 22, "bold"), bg="#ffffff", fg="#333333").pack(pady=20)
-    tk.Label(overlay, text=f"Final Score: {score}/100", font=("Helvetica", 16), bg="#ffffff").pack(pady=10)
-    tk.Label(overlay, text=f"Rank: {rank}", font=("Helvetica", 16, "bold"), bg="#ffffff", fg="#4caf50").pack(pady=10)
-    for text, cmd, color in [("Play Again", displayMenu, "#4caf50"), ("Exit", root.quit, "#f44336")]:
-        btn = tk.Button(overlay, text=text, font=("Helvetica", 14, "bold"), bg=color, fg="white", command=cmd, width=15)
-        btn.pack(pady=8)
-        btn.bind("<Enter>", lambda e, b=btn, c=color: b.config(bg=darker_color(c)))
-        btn.bind("<Leave>", lambda e, b=btn, c=color: b.config(bg=c))
+    stop_timer()
+    score_label.config(text=f"Final Score: {quiz.score}/{QUESTIONS * 10}")
+    rank_label.config(text=f"Rank: {quiz.rank()}")
+
+    standing_label.config(text="")
+    if results is not None:
+        try:
+            results.record_quiz(player, quiz)
+        except OSError:
+            pass  # read-only folder: the score is shown, just not kept
+        else:
+            best_score, _ = results.best(player, quiz.difficulty)
+            leaders = ", ".join(f"{name} {score}" for name, score, _ in results.top(quiz.difficulty, 3))
+            standing_label.config(text=f"Your best: {best_score}/{QUESTIONS * 10} · "
+                                       f"beat {results.percentile(quiz.difficulty, quiz.score)}% of {quiz.difficulty} games\n"
+                                       f"Top 3: {leaders}")
+    show_screen("results")
 
 def start_quiz(level):
-    global difficulty, score, question_number
-    difficulty = level
-    score = 0
-    question_number = 1
+    quiz.start(level)
     displayProblem()
 
-def clear_overlay():
-    for widget in overlay.winfo_children():
-        widget.destroy()
+# ================= Screens ================= #
+
+def show_screen(name):
+    """Hide the current screen and show another; nothing is rebuilt."""
+    global current_screen
+    if current_screen == name:
+        return
+    if current_screen is not None:
+        screens[current_screen].pack_forget()
+    screens[name].pack()
+    current_screen = name
+
+def hover_button(parent, text, color, command, hover=None, **options):
+    hover = hover or darker_color(color)
+    btn = tk.Button(parent, text=text, bg=color, fg="white", command=command, **options)
+    btn.bind("<Enter>", lambda e: btn.config(bg=hover))
+    btn.bind("<Leave>", lambda e: btn.config(bg=color))
+    return btn
+
+def build_screens():
+    """Create every screen once; the display functions only fill them in."""
+    global question_label, progress_trough, progress_bar, problem_label, answer_entry
+    global countdown, score_label, rank_label, standing_label
+
+    intro = screens["intro"] = tk.Frame(overlay, bg="#ffffff")
+    tk.Label(intro, text="🎓 Welcome to the Maths Quiz!", font=("Helvetica", 22, "bold"), bg="#ffffff").pack(pady=40)
+    tk.Label(intro, text="Test your brain, beat the timer,\nand earn the highest rank!", font=("Helvetica", 14), bg="#ffffff").pack(pady=10)
+
+    start = screens["start"] = tk.Frame(overlay, bg="#ffffff")
+    tk.Label(start, text="📑💭Maths Quiz !?🤓🤔", font=("Helvetica", 26, "bold"), bg="#FFFFFF", fg="#000000").pack(pady=20)
+    tk.Button(start, text="Start Quiz", font=("Helvetica", 16, "bold"), bg="#2196f3", fg="white", width=20, command=displayMenu).pack(pady=10)
+    tk.Button(start, text="Exit", font=("Helvetica", 16, "bold"), bg="#f44336", fg="white", width=20, command=root.quit).pack(pady=5)
+
+    menu = screens["menu"] = tk.Frame(overlay, bg="#ffffff")
+    tk.Label(menu, text="Select Difficulty Level", font=("Helvetica", 18, "bold"), bg="#ffffff").pack(pady=20)
+    for level, text in [("easy", "Easy (1-digit)"), ("moderate", "Moderate (2-digit)"), ("advanced", "Advanced (4-digit)")]:
+        hover_button(menu, text, "#4caf50", lambda l=level: start_quiz(l), hover="#45a049", width=20,
+                     font=("Helvetica", 14, "bold"), activebackground="#45a049").pack(pady=8)
+
+    question = screens["question"] = tk.Frame(overlay, bg="#ffffff")
+    question_label = tk.Label(question, font=("Helvetica", 16, "bold"), bg="#ffffff")
+    question_label.pack(pady=(10, 5))
+
+    # Grey progress bar (top)
+    progress_canvas = tk.Canvas(question, width=300, height=20, bg="#ffffff", highlightthickness=0)
+    progress_canvas.pack(pady=(0, 15))
+    progress_trough = draw_rounded_bar(progress_canvas, 0, 0, 300, 20, fill="#eeeeee")
+    progress_bar = draw_rounded_bar(progress_canvas, 0, 0, 300, 20, fill="#9e9e9e", value=0, bg="#eeeeee")
+
+    # Problem text
+    problem_label = tk.Label(question, font=("Helvetica", 30, "bold"), bg="#ffffff", fg="#333333")
+    problem_label.pack(pady=10)
+
+    # Answer entry
+    answer_entry = tk.Entry(question, font=("Helvetica", 16), justify="center", bd=2, relief="groove")
+    answer_entry.pack(pady=10)
+
+    # Submit + menu buttons
+    tk.Button(question, text="Submit Answer", font=("Helvetica", 14, "bold"),
+              bg="#2196f3", fg="white", activebackground="#1976d2", command=check_answer).pack(pady=10)
+    tk.Button(question, text="Back to Menu", font=("Helvetica", 12),
+              bg="#ff9800", fg="white", command=displayMenu).pack(pady=5)
+
+    # Timer
+    timer_canvas = tk.Canvas(question, width=300, height=30, bg="#ffffff", highlightthickness=0)
+    timer_canvas.pack(pady=15)
+    countdown = CountdownTimer(timer_canvas, 300, 30, TIME_LIMIT, on_expire=time_up)
+
+    results = screens["results"] = tk.Frame(overlay, bg="#ffffff")
+    tk.Label(results, text="Quiz Complete!", font=("Helvetica", 22, "bold"), bg="#ffffff", fg="#333333").pack(pady=20)
+    score_label = tk.Label(results, font=("Helvetica", 16), bg="#ffffff")
+    score_label.pack(pady=10)
+    rank_label = tk.Label(results, font=("Helvetica", 16, "bold"), bg="#ffffff", fg="#4caf50")
+    rank_label.pack(pady=10)
+    standing_label = tk.Label(results, font=("Helvetica", 11), bg="#ffffff", fg="#555555")
+    standing_label.pack(pady=(0, 10))
+    for text, cmd, color in [("Play Again", displayMenu, "#4caf50"), ("Exit", root.quit, "#f44336")]:
+        hover_button(results, text, color, cmd, font=("Helvetica", 14, "bold"), width=15).pack(pady=8)
+
+# ================= Latency Measurement ================= #
+
+# With --measure, time from an answer being submitted (after its feedback
+# dialog is closed) until the next question is drawn and accepting input.
+measure_latency = "--measure" in sys.argv
+submitted_at = None
+latencies = []
+
+def submitted():
+    global submitted_at
+    if measure_latency:
+        submitted_at = time.perf_counter()
+
+def record_latency():
+    global submitted_at
+    latencies.append(time.perf_counter() - submitted_at)
+    submitted_at = None
+    print(f"submit -> interactive: {latencies[-1] * 1000:.2f} ms")
+
+def latency_report():
+    if not latencies:
+        return "submit -> interactive: no questions answered"
+    ordered = sorted(latencies)
+    return (f"submit -> interactive over {len(ordered)} questions: "
+            f"median {ordered[len(ordered) // 2] * 1000:.2f} ms, "
+            f"mean {sum(ordered) / len(ordered) * 1000:.2f} ms, max {ordered[-1] * 1000:.2f} ms")
 
 # ================= Gradient Background ================= #
 
-def draw_gradient(canvas, color1, color2):
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+def rgb16(canvas, color):
+    """16-bit channels of a colour, like winfo_rgb but without asking Tk for hex."""
+    if len(color) == 7 and color.startswith("#"):
+        return tuple(int(color[i:i + 2], 16) * 257 for i in (1, 3, 5))
+    return canvas.winfo_rgb(color)
+
+def gradient_colors(canvas, color1, color2, height):
+    r1, g1, b1 = rgb16(canvas, color1)
+    r2, g2, b2 = rgb16(canvas, color2)
+    colors = []
+    for i in range(height):
+        r = int(r1 + (r2 - r1) * i / height) >> 8
+        g = int(g1 + (g2 - g1) * i / height) >> 8
+        b = int(b1 + (b2 - b1) * i / height) >> 8
+        colors.append(f'#{r:02x}{g:02x}{b:02x}')
+    return colors
+
+def gradient_image(canvas, color1, color2, width, height):
+    """Gradient as one image: a 1-pixel column, cached on disk, zoomed to width."""
+    name = f"gradient-{color1.lstrip('#')}-{color2.lstrip('#')}-{height}.ppm"
+    path = os.path.join(CACHE_DIR, name)
+    try:
+        column = tk.PhotoImage(master=canvas, file=path)
+    except tk.TclError:
+        column = tk.PhotoImage(master=canvas, width=1, height=height)
+        column.put(" ".join("{%s}" % color for color in gradient_colors(canvas, color1, color2, height)))
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            column.write(path, format="ppm")
+        except (OSError, tk.TclError):
+            pass  # no cache this time, the image is still fine
+    return column.zoom(width, 1)
+
+def draw_gradient(canvas, color1, color2, width=500, height=550):
     """Draw a smooth vertical gradient."""
-    for i in range(550):
-        r1, g1, b1 = canvas.winfo_rgb(color1)
-        r2, g2, b2 = canvas.winfo_rgb(color2)
-        r = int(r1 + (r2 - r1) * i / 550) >> 8
-        g = int(g1 + (g2 - g1) * i / 550) >> 8
-        b = int(b1 + (b2 - b1) * i / 550) >> 8
-        color = f'#{r:02x}{g:02x}{b:02x}'
-        canvas.create_line(0, i, 500, i, fill=color)
+    try:
+        canvas.gradient = gradient_image(canvas, color1, color2, width, height)
+        canvas.create_image(0, 0, image=canvas.gradient, anchor="nw")
+        return
+    except tk.TclError:
+        pass
+    # No image support: one rectangle per run of identical colours.
+    colors = gradient_colors(canvas, color1, color2, height)
+    start = 0
+    for i in range(1, height + 1):
+        if i == height or colors[i] != colors[start]:
+            canvas.create_rectangle(0, start, width, i, fill=colors[start], outline="")
+            start = i
 
 # ================= Intro Screen ================= #
 
 def show_intro():
-    clear_overlay()
-    overlay.config(bg="#ffffff")
-    tk.Label(overlay, text="🎓 Welcome to the Maths Quiz!", font=("Helvetica", 22, "bold"), bg="#ffffff").pack(pady=40)
-    tk.Label(overlay, text="Test your brain, beat the timer,\nand earn the highest rank!", font=("Helvetica", 14), bg="#ffffff").pack(pady=10)
+    show_screen("intro")
     root.after(3000, show_start_screen)  # show menu after 3 seconds
 
 def show_start_screen():
-    clear_overlay()
-    tk.Label(overlay, text="📑💭Maths Quiz !?🤓🤔", font=("Helvetica", 26, "bold"), bg="#FFFFFF", fg="#000000").pack(pady=20)
-    start_btn = tk.Button(overlay, text="Start Quiz", font=("Helvetica", 16, "bold"), bg="#2196f3", fg="white", width=20, command=displayMenu)
-    start_btn.pack(pady=10)
-    exit_btn = tk.Button(overlay, text="Exit", font=("Helvetica", 16, "bold"), bg="#f44336", fg="white", width=20, command=root.quit)
-    exit_btn.pack(pady=5)
+    show_screen("start")
 
 # ================= Main Window ================= #
 
+# --seed N replays the same problems every run.
+seed = int(sys.argv[sys.argv.index("--seed") + 1]) if "--seed" in sys.argv else None
+quiz = QuizEngine(seed)
+
+# Finished games are kept in quiz_results.* next to this file, opened after the first frame.
+player = sys.argv[sys.argv.index("--player") + 1] if "--player" in sys.argv else getpass.getuser()
+results = None
+
+def open_results():
+    global results
+    try:
+        results = QuizResults(os.path.join(os.path.dirname(os.path.abspath(__file__)), "quiz_results"))
+    except OSError:
+        results = None  # read-only folder: play on without a leaderboard
+
+countdown = None
+screens = {}
+current_screen = None
+
 root = tk.Tk()
 root.title("Maths Quiz")
 root.geometry("500x550")
 root.resizable(False, False)
 
-bg_canvas = tk.Canvas(root, width=500, height=550, highlightthickness=0)
+if "--profile-trace" in sys.argv:
+    import TkProfiler
+    TkProfiler.install(root, sys.argv[sys.argv.index("--profile-trace") + 1])
+
+# Plain top colour until the gradient is drawn just after the first frame.
+bg_canvas = tk.Canvas(root, width=500, height=550, highlightthickness=0, bg="#89f7fe")
 bg_canvas.pack(fill="both", expand=True)
-draw_gradient(bg_canvas, "#89f7fe", "#66a6ff")
 
 overlay = tk.Frame(root, bg="#ffffff", bd=3, relief="ridge", highlightbackground="#bbbbbb", highlightthickness=2)
 overlay.place(relx=0.5, rely=0.5, anchor="center")
 
+build_screens()
 show_intro()
+Startup.after_first_frame(root, ("gradient", lambda: draw_gradient(bg_canvas, "#89f7fe", "#66a6ff")),
+                          ("results", open_results))
 
 root.mainloop()
+if results is not None:
+    results.close()
+
+if "--timer-stats" in sys.argv:
+    print(timer_stats.report())
+if measure_latency:
+    print(latency_report())
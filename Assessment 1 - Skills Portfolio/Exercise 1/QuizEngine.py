@@ -0,0 +1,269 @@
+import random
+import time
+from array import array
+from typing import NamedTuple
+
+np = None  # NumPy if installed; imported by _numpy() on first use, not at startup
+_numpy_checked = False
+
+def _numpy():
+    global np, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+    return np
+
+# ================= Rules ================= #
+
+LEVELS = {"easy": (1, 9), "moderate": (10, 99), "advanced": (1000, 9999)}
+QUESTIONS = 10
+TIME_LIMIT = 60
+OPERATIONS = "+-"
+
+def rank_for(score):
+    return "A+" if score >= 90 else "A" if score >= 80 else "B" if score >= 70 else "C" if score >= 60 else "Needs Improvement"
+
+def points_for(attempt):
+    return 10 if attempt == 1 else 5
+
+class Problem(NamedTuple):
+    num1: int
+    operation: str
+    num2: int
+
+    @property
+    def answer(self):
+        return self.num1 + self.num2 if self.operation == "+" else self.num1 - self.num2
+
+    def __str__(self):
+        return f"{self.num1} {self.operation} {self.num2} ="
+
+class Outcome(NamedTuple):
+    correct: bool
+    points: int
+    moved_on: bool  # False only for a first wrong attempt
+
+# ================= Session ================= #
+
+class QuizEngine:
+    """One quiz session: problems, attempts, score and rank, without any UI.
+
+    The same seed and answers always give the same session, and history
+    keeps (problem, answers given, points, seconds taken) per question so
+    a session can be replayed or stored.
+    """
+
+    def __init__(self, seed=None, clock=time.monotonic):
+        self.rng = random.Random(seed)
+        self.clock = clock
+        self.asked_at = None
+        self.difficulty = None
+        self.score = 0
+        self.question_number = 0
+        self.problem = None
+        self.attempt = 1
+        self.answers = []
+        self.history = []
+
+    def start(self, level):
+        if level not in LEVELS:
+            raise ValueError(f"Unknown difficulty {level!r}.")
+        self.difficulty = level
+        self.score = 0
+        self.question_number = 1
+        self.history = []
+        return self.new_problem()
+
+    def random_int(self):
+        low, high = LEVELS[self.difficulty]
+        return self.rng.randint(low, high)
+
+    def new_problem(self):
+        operation = self.rng.choice(OPERATIONS)
+        num1 = self.random_int()
+        num2 = self.random_int()
+        if operation == "-" and num1 < num2:
+            num1, num2 = num2, num1
+        self.problem = Problem(num1, operation, num2)
+        self.attempt = 1
+        self.answers = []
+        self.asked_at = self.clock()
+        return self.problem
+
+    def is_correct(self, answer):
+        return answer == self.problem.answer
+
+    def submit(self, answer):
+        """Score an answer. A first wrong attempt gets a second try."""
+        self.answers.append(answer)
+        if self.is_correct(answer):
+            points = points_for(self.attempt)
+            self.score += points
+            self._finish_question(points)
+            return Outcome(True, points, True)
+        if self.attempt == 1:
+            self.attempt += 1
+            return Outcome(False, 0, False)
+        self._finish_question(0)
+        return Outcome(False, 0, True)
+
+    def time_up(self):
+        self._finish_question(0)
+
+    def _finish_question(self, points):
+        self.history.append((self.problem, tuple(self.answers), points, self.clock() - self.asked_at))
+
+    def advance(self):
+        """Move to the next question; returns the problem, or None when finished."""
+        self.question_number += 1
+        if self.finished:
+            self.problem = None
+            return None
+        return self.new_problem()
+
+    @property
+    def finished(self):
+        return self.question_number > QUESTIONS
+
+    def progress(self):
+        """Fraction of the quiz done before the current question."""
+        return (self.question_number - 1) / QUESTIONS
+
+    def rank(self):
+        return rank_for(self.score)
+
+# ================= Batch Generation ================= #
+
+class ProblemBatch:
+    """Many problems stored column-wise: num1, num2, ops (bytes) and answers.
+
+    Columns are numpy arrays when numpy is installed, arrays otherwise.
+    """
+
+    def __init__(self, num1, num2, ops, answers):
+        self.num1 = num1
+        self.num2 = num2
+        self.ops = ops
+        self.answers = answers
+
+    def __len__(self):
+        return len(self.ops)
+
+    def __getitem__(self, i):
+        return Problem(int(self.num1[i]), chr(self.ops[i]), int(self.num2[i]))
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+def generate_batch(count, level="easy", seed=None, unique=False,
+                   operations=OPERATIONS, min_answer=None, max_answer=None):
+    """count problems at one level, optionally distinct and within an answer range.
+
+    Subtractions never go negative, as in the quiz. A seed makes the batch
+    repeatable (with or without numpy, though the two give different
+    batches). Raises ValueError if the constraints allow fewer than count
+    distinct problems.
+    """
+    if level not in LEVELS:
+        raise ValueError(f"Unknown difficulty {level!r}.")
+    if not operations or set(operations) - set(OPERATIONS):
+        raise ValueError(f"Operations must be some of {OPERATIONS!r}.")
+    low, high = LEVELS[level]
+    if unique:
+        # a+b and b+a are different problems, but a-b and b-a are both
+        # asked as the larger minus the smaller.
+        n = high - low + 1
+        space = n * n * ("+" in operations) + n * (n + 1) // 2 * ("-" in operations)
+        if count > space:
+            raise ValueError(f"Only {space} distinct {level} problems exist.")
+    make = _batch_numpy if _numpy() is not None else _batch_pure
+    return make(count, low, high, seed, unique, operations.encode(), min_answer, max_answer)
+
+def _batch_numpy(count, low, high, seed, unique, operations, min_answer, max_answer):
+    if count <= 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return ProblemBatch(empty, empty, b"", empty)
+    rng = np.random.default_rng(seed)
+    ops_choice = np.frombuffer(operations, dtype=np.uint8)
+    columns = None
+    drawn = 0
+    stalls = 0
+    while stalls < 20:
+        have = 0 if columns is None else len(columns[2])
+        if have >= count:
+            break
+        # Oversample by the share of draws that survived so far.
+        rate = have / drawn if have else 1.0
+        n = min(int((count - have) / rate * 1.1) + 1024, 2 * max(count, 1 << 20))
+        drawn += n
+
+        num1 = rng.integers(low, high + 1, n)
+        num2 = rng.integers(low, high + 1, n)
+        ops = ops_choice[rng.integers(0, len(ops_choice), n)]
+        minus = ops == ord("-")
+        swap = minus & (num1 < num2)
+        num1[swap], num2[swap] = num2[swap], num1[swap]
+        answers = np.where(minus, num1 - num2, num1 + num2)
+
+        keep = np.ones(n, dtype=bool)
+        if min_answer is not None:
+            keep &= answers >= min_answer
+        if max_answer is not None:
+            keep &= answers <= max_answer
+        fresh = (num1[keep], num2[keep], ops[keep], answers[keep])
+        columns = fresh if columns is None else [np.concatenate(pair) for pair in zip(columns, fresh)]
+
+        if unique:
+            # Keep the first copy of each problem, in draw order.
+            keys = (columns[0] * (high + 1) + columns[1]) * 2 + (columns[2] == ord("-"))
+            _, first = np.unique(keys, return_index=True)
+            first.sort()
+            columns = [column[first] for column in columns]
+        stalls = stalls + 1 if len(columns[2]) == have else 0
+
+    if len(columns[2]) < count:
+        raise ValueError(f"Only found {len(columns[2])} problems matching the constraints.")
+    num1, num2, ops, answers = (column[:count] for column in columns)
+    return ProblemBatch(num1, num2, ops.tobytes(), answers)
+
+def _batch_pure(count, low, high, seed, unique, operations, min_answer, max_answer):
+    rng = random.Random(seed)
+    values = range(low, high + 1)
+    num1s, num2s, answers = array("q"), array("q"), array("q")
+    ops = bytearray()
+    seen = set()
+    stalls = 0
+    while len(ops) < count and stalls < 20:
+        n = max(count - len(ops), 1024) * 2
+        before = len(ops)
+        # Drawing whole columns with choices() is far cheaper than randint() per value.
+        for op, num1, num2 in zip(rng.choices(operations, k=n), rng.choices(values, k=n), rng.choices(values, k=n)):
+            if op == 45:  # b"-"
+                if num1 < num2:
+                    num1, num2 = num2, num1
+                answer = num1 - num2
+            else:
+                answer = num1 + num2
+            if min_answer is not None and answer < min_answer:
+                continue
+            if max_answer is not None and answer > max_answer:
+                continue
+            if unique:
+                key = (num1, op, num2)
+                if key in seen:
+                    continue
+                seen.add(key)
+            num1s.append(num1)
+            num2s.append(num2)
+            ops.append(op)
+            answers.append(answer)
+            if len(ops) == count:
+                break
+        stalls = stalls + 1 if len(ops) == before else 0
+
+    if len(ops) < count:
+        raise ValueError(f"Only found {len(ops)} problems matching the constraints.")
+    return ProblemBatch(num1s, num2s, bytes(ops), answers)
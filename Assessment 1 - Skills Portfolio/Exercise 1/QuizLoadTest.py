@@ -0,0 +1,125 @@
+"""Simulate a class of students playing against QuizServer.py.
+
+    python QuizLoadTest.py --students 2000 --spawn
+    python QuizLoadTest.py --students 500 --port 8765 --think 0.5 --accuracy 0.7
+
+Every student connects, plays a full quiz and disconnects. The time from
+sending an answer to reading the server's reply is recorded, and latency
+percentiles are printed at the end.
+"""
+import argparse
+import asyncio
+import random
+import subprocess
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from QuizEngine import LEVELS
+
+def percentile(ordered, p):
+    if not ordered:
+        return float("nan")
+    return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)]
+
+async def student(host, port, level, seed, think, accuracy, latencies, errors):
+    rng = random.Random(seed)
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError as e:
+        errors.append(str(e))
+        return None
+    try:
+        writer.write(f"START {level} {seed}\n".encode())
+        line = (await reader.readline()).decode().split()
+        while line and line[0] == "PROBLEM":
+            _, _, num1, operation, num2 = line
+            answer = int(num1) + int(num2) if operation == "+" else int(num1) - int(num2)
+            guess = answer if rng.random() < accuracy else answer + 1
+            while True:
+                if think:
+                    await asyncio.sleep(rng.uniform(0, think))
+                started = time.perf_counter()
+                writer.write(f"ANSWER {guess}\n".encode())
+                reply = (await reader.readline()).decode().split()
+                latencies.append(time.perf_counter() - started)
+                if reply and reply[0] == "TRY_AGAIN":
+                    guess = answer
+                    continue
+                break
+            line = (await reader.readline()).decode().split()
+        if not line or line[0] != "DONE":
+            errors.append(f"unexpected reply {line}")
+            return None
+        return int(line[1])
+    except (OSError, ValueError) as e:
+        errors.append(str(e))
+        return None
+    finally:
+        writer.close()
+
+async def run(args):
+    latencies, errors = [], []
+    started = time.perf_counter()
+    scores = await asyncio.gather(*(
+        student(args.host, args.port, args.level, args.seed + i, args.think, args.accuracy, latencies, errors)
+        for i in range(args.students)))
+    return scores, latencies, errors, time.perf_counter() - started
+
+def raise_file_limit():
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and (hard == resource.RLIM_INFINITY or soft < hard):
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard if hard != resource.RLIM_INFINITY else 65536, hard))
+
+def spawn_server(port):
+    server = subprocess.Popen([sys.executable, "QuizServer.py", "--port", str(port)],
+                              cwd=sys.path[0] or ".", stdout=subprocess.PIPE, text=True)
+    server.stdout.readline()  # "Maths Quiz server on ..."
+    time.sleep(0.2)
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the Maths Quiz server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--level", choices=list(LEVELS), default="moderate")
+    parser.add_argument("--think", type=float, default=1.0,
+                        help="max random seconds a student waits before answering; "
+                             "0 answers at once, which measures the server flat out")
+    parser.add_argument("--accuracy", type=float, default=0.8,
+                        help="chance a first attempt is right")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spawn", action="store_true", help="start a server for the test")
+    args = parser.parse_args(argv)
+
+    raise_file_limit()
+    server = spawn_server(args.port) if args.spawn else None
+    try:
+        scores, latencies, errors, elapsed = asyncio.run(run(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    finished = [s for s in scores if s is not None]
+    ordered = sorted(latencies)
+    print(f"students: {args.students}, finished: {len(finished)}, errors: {len(errors)}")
+    print(f"answers: {len(ordered)} in {elapsed:.2f} s ({len(ordered) / elapsed:.0f}/s)")
+    print("latency ms: " + ", ".join(f"p{p} {percentile(ordered, p) * 1000:.2f}"
+                                     for p in (50, 90, 99, 99.9))
+          + f", max {ordered[-1] * 1000 if ordered else float('nan'):.2f}")
+    if finished:
+        print(f"average score: {sum(finished) / len(finished):.1f}")
+    for error in errors[:5]:
+        print("error:", error)
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""Append-only store of finished quiz sessions, with leaderboards.
+
+Sessions go into <name>.dat as fixed-size binary records; player names go
+into <name>.players, one per line, and records refer to them by number.
+A separate <name>.idx holds the index (score histograms, top-k per
+difficulty, each player's bests) up to some record count, so opening
+only reads the records added since it was last saved.
+"""
+import bisect
+import json
+import os
+import struct
+import time
+
+from QuizEngine import LEVELS, QUESTIONS
+
+# player, finished at, difficulty, score, then per question: answer time
+# in centiseconds and answers given (0 = ran out of time without one).
+RECORD = struct.Struct(f"<IdBH{QUESTIONS}H{QUESTIONS}B")
+DIFFICULTIES = list(LEVELS)
+MAX_SCORE = QUESTIONS * 10
+TOP_K = 100
+INDEX_EVERY = 10000  # save the index after this many new sessions
+
+class QuizResults:
+    """Results file plus an index kept in step with every append.
+
+    Leaderboards hold the best TOP_K sessions per difficulty, best first:
+    higher score, then less total time, then earlier. Percentiles come
+    from per-difficulty score histograms, so nothing scans the records.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.players = []
+        self.player_ids = {}
+        self.unsaved = 0
+        self._reset_index()
+        self._load_players()
+        self._load_index()
+        self._catch_up()
+        self.file = open(self.path + ".dat", "ab")
+
+    # ================= Opening ================= #
+
+    def _load_players(self):
+        try:
+            with open(self.path + ".players", encoding="utf-8") as f:
+                for line in f:
+                    self._player_id(line.rstrip("\n"), save=False)
+        except FileNotFoundError:
+            pass
+
+    def _load_index(self):
+        try:
+            with open(self.path + ".idx", encoding="utf-8") as f:
+                index = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        self.count = index["count"]
+        self.histograms = index["histograms"]
+        self.leaders = {d: [tuple(entry) for entry in entries] for d, entries in index["leaders"].items()}
+        self.bests = {int(player): bests for player, bests in index["bests"].items()}
+
+    def _catch_up(self):
+        """Index records written after the saved index, dropping any torn tail."""
+        try:
+            size = os.path.getsize(self.path + ".dat")
+        except FileNotFoundError:
+            size = 0
+        whole = size - size % RECORD.size
+        if size != whole:
+            with open(self.path + ".dat", "r+b") as f:
+                f.truncate(whole)
+        if self.count * RECORD.size > whole:
+            # The results file is older than the index; start over.
+            self._reset_index()
+        with open(self.path + ".dat", "ab+") as f:
+            f.seek(self.count * RECORD.size)
+            data = f.read()
+        for record in RECORD.iter_unpack(data):
+            self._index(*self._decode(record))
+        if data:
+            self.save_index()
+
+    def _reset_index(self):
+        self.count = 0
+        self.histograms = {d: [0] * (MAX_SCORE + 1) for d in DIFFICULTIES}
+        self.leaders = {d: [] for d in DIFFICULTIES}  # sorted (-score, time, seq, player)
+        self.bests = {}  # player -> {difficulty: [score, time, seq]}
+
+    def _decode(self, record):
+        player, _, difficulty, score = record[:4]
+        times = record[4:4 + QUESTIONS]
+        return player, DIFFICULTIES[difficulty], score, sum(times) / 100
+
+    # ================= Recording ================= #
+
+    def _player_id(self, name, save=True):
+        if name not in self.player_ids:
+            self.player_ids[name] = len(self.players)
+            self.players.append(name)
+            if save:
+                with open(self.path + ".players", "a", encoding="utf-8") as f:
+                    f.write(name + "\n")
+        return self.player_ids[name]
+
+    def record(self, player, difficulty, score, answer_times, attempts, finished_at=None):
+        """Append one finished session; returns its sequence number."""
+        player = self._player_id(player.replace("\n", " "))
+        times = [min(int(round(t * 100)), 0xFFFF) for t in answer_times]
+        self.file.write(RECORD.pack(player, finished_at or time.time(),
+                                    DIFFICULTIES.index(difficulty), score, *times, *attempts))
+        self.file.flush()
+        seq = self.count
+        self._index(player, difficulty, score, sum(times) / 100)
+        self.unsaved += 1
+        if self.unsaved >= INDEX_EVERY:
+            self.save_index()
+        return seq
+
+    def record_quiz(self, player, quiz, finished_at=None):
+        """Record a finished QuizEngine session."""
+        return self.record(player, quiz.difficulty, quiz.score,
+                           [seconds for *_, seconds in quiz.history],
+                           [len(answers) for _, answers, _, _ in quiz.history], finished_at)
+
+    def _index(self, player, difficulty, score, total_time):
+        seq = self.count
+        self.count += 1
+        self.histograms[difficulty][score] += 1
+
+        leaders = self.leaders[difficulty]
+        entry = (-score, total_time, seq, player)
+        if len(leaders) < TOP_K or entry < leaders[-1]:
+            bisect.insort(leaders, entry)
+            del leaders[TOP_K:]
+
+        best = self.bests.setdefault(player, {}).get(difficulty)
+        if best is None or (-score, total_time) < (-best[0], best[1]):
+            self.bests[player][difficulty] = [score, total_time, seq]
+
+    def save_index(self):
+        index = {"count": self.count, "histograms": self.histograms,
+                 "leaders": self.leaders, "bests": self.bests}
+        tmp = self.path + ".idx.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps(index, separators=(",", ":")))  # dumps uses the C encoder
+        os.replace(tmp, self.path + ".idx")
+        self.unsaved = 0
+
+    def close(self):
+        if self.unsaved:
+            self.save_index()
+        self.file.close()
+
+    # ================= Queries ================= #
+
+    def top(self, difficulty, k=10):
+        """Best k sessions as (player, score, total seconds), best first."""
+        return [(self.players[player], -score, total_time)
+                for score, total_time, _, player in self.leaders[difficulty][:k]]
+
+    def best(self, player, difficulty):
+        """A player's best (score, total seconds) at a difficulty, or None."""
+        best = self.bests.get(self.player_ids.get(player), {}).get(difficulty)
+        return None if best is None else (best[0], best[1])
+
+    def sessions(self, difficulty=None):
+        if difficulty is None:
+            return self.count
+        return sum(self.histograms[difficulty])
+
+    def percentile(self, difficulty, score):
+        """Share of sessions at a difficulty that scored below score, 0-100."""
+        histogram = self.histograms[difficulty]
+        total = sum(histogram)
+        if not total:
+            return None
+        return round(sum(histogram[:score]) / total * 100, 1)
+
+    def score_at(self, difficulty, p):
+        """Score at the p-th percentile of a difficulty, or None if no sessions."""
+        histogram = self.histograms[difficulty]
+        total = sum(histogram)
+        if not total:
+            return None
+        target = min(int(total * p / 100), total - 1)
+        seen = 0
+        for score, count in enumerate(histogram):
+            seen += count
+            if seen > target:
+                return score
@@ -0,0 +1,184 @@
+"""Host Maths Quiz sessions for many players at once.
+
+    python QuizServer.py --port 8765
+
+Each connection is one player. The protocol is one line per message:
+
+    client                      server
+    START <level> [seed]        PROBLEM <n> <num1> <op> <num2>
+    ANSWER <number>             CORRECT <points> <score> | TRY_AGAIN | WRONG <score>
+                                ...then the next PROBLEM, or DONE <score> <rank>
+    QUIT                        (connection closed)
+
+If a question's time runs out the server sends TIMEUP <score> and moves on.
+Mistakes get ERROR <message>. Every session's timer lives in one shared
+scheduler, not in a task per player.
+"""
+import argparse
+import asyncio
+import heapq
+import itertools
+import time
+
+from QuizEngine import LEVELS, TIME_LIMIT, QuizEngine
+
+# ================= Timers ================= #
+
+class TimerScheduler:
+    """One task that fires every session's question deadline.
+
+    Deadlines sit in a heap. Restarting or stopping a session's timer just
+    bumps its token, so stale heap entries are skipped when they come up
+    instead of being removed.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.wakeup = asyncio.Event()
+        self.order = itertools.count()
+
+    def schedule(self, session, seconds):
+        session.timer_token += 1
+        deadline = time.monotonic() + seconds
+        heapq.heappush(self.heap, (deadline, next(self.order), session, session.timer_token))
+        if self.heap[0][2] is session:
+            self.wakeup.set()
+
+    def cancel(self, session):
+        session.timer_token += 1
+
+    async def run(self):
+        while True:
+            while self.heap and self.heap[0][3] != self.heap[0][2].timer_token:
+                heapq.heappop(self.heap)
+            self.wakeup.clear()
+            if not self.heap:
+                await self.wakeup.wait()
+                continue
+            delay = self.heap[0][0] - time.monotonic()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            _, _, session, token = heapq.heappop(self.heap)
+            if token == session.timer_token:
+                session.time_up()
+
+# ================= Sessions ================= #
+
+class Session:
+    def __init__(self, server, writer):
+        self.server = server
+        self.writer = writer
+        self.quiz = None
+        self.timer_token = 0
+
+    def send(self, *words):
+        self.writer.write((" ".join(str(word) for word in words) + "\n").encode())
+
+    def send_problem(self):
+        quiz = self.quiz
+        if quiz.problem is None:
+            self.server.timers.cancel(self)
+            self.send("DONE", quiz.score, quiz.rank())
+            self.server.finished += 1
+            return
+        num1, operation, num2 = quiz.problem
+        self.send("PROBLEM", quiz.question_number, num1, operation, num2)
+        self.server.timers.schedule(self, self.server.time_limit)
+
+    def handle(self, line):
+        command, _, rest = line.strip().partition(" ")
+        command = command.upper()
+        if command == "START":
+            args = rest.split()
+            if not args or args[0] not in LEVELS:
+                return self.send("ERROR", "level must be one of", *LEVELS)
+            seed = int(args[1]) if len(args) > 1 and args[1].lstrip("-").isdigit() else None
+            self.quiz = QuizEngine(seed)
+            self.quiz.start(args[0])
+            self.send_problem()
+        elif command == "ANSWER":
+            if self.quiz is None or self.quiz.problem is None:
+                return self.send("ERROR", "no question in progress")
+            try:
+                answer = int(rest)
+            except ValueError:
+                return self.send("ERROR", "please enter a number")
+            outcome = self.quiz.submit(answer)
+            if not outcome.moved_on:
+                return self.send("TRY_AGAIN")
+            if outcome.correct:
+                self.send("CORRECT", outcome.points, self.quiz.score)
+            else:
+                self.send("WRONG", self.quiz.score)
+            self.quiz.advance()
+            self.send_problem()
+        elif command == "QUIT":
+            return False
+        elif command:
+            self.send("ERROR", "unknown command", command)
+        return True
+
+    def time_up(self):
+        self.quiz.time_up()
+        self.send("TIMEUP", self.quiz.score)
+        self.quiz.advance()
+        self.send_problem()
+
+    def close(self):
+        self.server.timers.cancel(self)
+
+# ================= Server ================= #
+
+class QuizServer:
+    def __init__(self, time_limit=TIME_LIMIT):
+        self.time_limit = time_limit
+        self.timers = TimerScheduler()
+        self.connected = 0
+        self.finished = 0
+
+    async def serve(self, host, port, ready=None):
+        scheduler = asyncio.create_task(self.timers.run())
+        server = await asyncio.start_server(self.client, host, port, backlog=4096)
+        if ready is not None:
+            ready.set_result(server.sockets[0].getsockname()[1])
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            scheduler.cancel()
+
+    async def client(self, reader, writer):
+        session = Session(self, writer)
+        self.connected += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line or session.handle(line.decode(errors="replace")) is False:
+                    break
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            session.close()
+            self.connected -= 1
+            writer.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the Maths Quiz to many players.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--time-limit", type=float, default=TIME_LIMIT,
+                        help="seconds per question (default: %(default)s)")
+    args = parser.parse_args(argv)
+    print(f"Maths Quiz server on {args.host}:{args.port}")
+    try:
+        asyncio.run(QuizServer(args.time_limit).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
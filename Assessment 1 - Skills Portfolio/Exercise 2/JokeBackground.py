@@ -0,0 +1,132 @@
+import hashlib
+import os
+import threading
+import tkinter as tk
+from collections import OrderedDict
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+DISK_KEEP = 16  # scaled files kept on disk, newest first
+
+class ScaledBackground:
+    """A background image scaled to any window size, decoded as rarely as possible.
+
+    Scaled copies are kept in three places, cheapest first:
+    - an in-memory LRU of PhotoImages;
+    - PPM files in .cache/, keyed by source path, mtime, size and target
+      size, which Tk loads by itself so a warm start never imports PIL;
+    - the decoded source, held once PIL has been needed.
+    JPEGs are decoded in draft mode at the smallest scale that still
+    covers the target.
+    """
+
+    def __init__(self, widget, path, keep=4):
+        self.widget = widget
+        self.path = path
+        self.keep = keep
+        self.images = OrderedDict()  # (width, height) -> PhotoImage
+        self.source = None           # decoded PIL image, once needed
+        self.full = False            # source decoded at full resolution
+        self.pending = None          # (size, callback, on_error) for a render in progress
+        self.error = None            # what the last render raised, if anything
+        stat = os.stat(path)
+        self.key = hashlib.sha1(f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}".encode()).hexdigest()[:16]
+
+    def cache_path(self, width, height):
+        return os.path.join(CACHE_DIR, f"background-{self.key}-{width}x{height}.ppm")
+
+    def cached(self, width, height):
+        """PhotoImage from memory or disk, or None if it has to be rendered."""
+        size = (width, height)
+        if size in self.images:
+            self.images.move_to_end(size)
+            return self.images[size]
+        try:
+            image = tk.PhotoImage(master=self.widget, file=self.cache_path(width, height))
+        except tk.TclError:
+            return None
+        return self.remember(size, image)
+
+    def remember(self, size, image):
+        self.images[size] = image
+        while len(self.images) > self.keep:
+            self.images.popitem(last=False)
+        return image
+
+    def get(self, width, height):
+        """PhotoImage at this size, rendering it now if it is not cached."""
+        image = self.cached(width, height)
+        if image is None:
+            self.render(width, height)
+            image = self.cached(width, height)
+        return image
+
+    def request(self, width, height, callback, on_error=None):
+        """Call callback(image) with this size, rendering it off the UI thread if needed.
+
+        If rendering fails, on_error(exception) is called instead.
+        """
+        image = self.cached(width, height)
+        if image is not None:
+            callback(image)
+            return
+        busy = self.pending is not None
+        self.pending = ((width, height), callback, on_error)
+        if not busy:
+            self._start_render()
+
+    def _start_render(self):
+        size, _, _ = self.pending
+        self.error = None
+        worker = threading.Thread(target=self._render, args=size, daemon=True)
+        worker.start()
+        self._wait(worker, size)
+
+    def _render(self, width, height):
+        try:
+            self.render(width, height)
+        except Exception as e:  # no PIL, a bad image, an unwritable .cache/
+            self.error = e
+
+    def _wait(self, worker, size):
+        if worker.is_alive():
+            self.widget.after(20, self._wait, worker, size)
+            return
+        (width, height), callback, on_error = self.pending
+        if self.error is None and (width, height) != size:
+            # Superseded by a newer size while rendering; go again.
+            self._start_render()
+            return
+        self.pending = None
+        image = None if self.error else self.cached(width, height)
+        if image is not None:
+            callback(image)
+        elif on_error:
+            on_error(self.error or OSError(f"Could not read the scaled copy of {self.path}"))
+
+    def render(self, width, height):
+        """Scale the source with PIL and write it to the disk cache (any thread)."""
+        from PIL import Image
+
+        source = self.source
+        if source is None or (not self.full and (source.width < width or source.height < height)):
+            source = Image.open(self.path)
+            full_size = source.size
+            source.draft("RGB", (width, height))
+            source = source.convert("RGB")
+            self.source, self.full = source, source.size == full_size
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        path = self.cache_path(width, height)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        source.resize((width, height)).save(tmp, "PPM")
+        os.replace(tmp, path)
+        self.prune()
+
+    def prune(self):
+        names = [os.path.join(CACHE_DIR, name) for name in os.listdir(CACHE_DIR)
+                 if name.startswith("background-") and name.endswith(".ppm")]
+        names.sort(key=os.path.getmtime, reverse=True)
+        for old in names[DISK_KEEP:]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
@@ -0,0 +1,241 @@
+import bisect
+import mmap
+import os
+import random
+import struct
+import threading
+from array import array
+
+# <jokes file>.lines: header, then the byte offset of every joke line.
+INDEX_HEADER = struct.Struct("<8sQqQ")  # magic, source size, source mtime_ns, count
+INDEX_MAGIC = b"JOKELNS1"
+MARK_BYTES = 64  # tail of the file remembered to tell an append from a rewrite
+
+def parse_joke(line):
+    """(setup, punchline) from one line, or None if it is not a joke."""
+    line = line.strip()
+    if "?" not in line:
+        return None
+    setup, punch = line.split("?", 1)
+    return setup + "?", punch.strip()
+
+class JokeCorpus:
+    """Jokes file read through mmap, one joke decoded at a time.
+
+    A line-offset index is kept next to the file and rebuilt only when
+    the file's size or mtime changes, and it is mapped too, so opening is
+    quick and memory stays flat however many jokes there are. Jokes
+    appended later are indexed from where the last scan stopped (see
+    JokeWatcher).
+    """
+
+    def __init__(self, path, index_path=None):
+        self.path = path
+        self.index_path = index_path or path + ".lines"
+        self.new_index_path = self.index_path + ".new"  # written by update_index, swapped in by reload
+        self.data = None
+        self.index_map = None
+        self.offsets = ()
+        self.size = self.mtime = 0
+        self.mark = b""
+        self.open()
+
+    def open(self):
+        stat = os.stat(self.path)
+        if not self._load_index(stat.st_size, stat.st_mtime_ns):
+            self._build_index(stat)
+            self._load_index(stat.st_size, stat.st_mtime_ns)
+        self._map_data()
+
+    def _map_data(self):
+        self.data = self._map(self.path)
+        self.mark = bytes(self.data[max(self.size - MARK_BYTES, 0):self.size])
+
+    def _map(self, path):
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _load_index(self, size, mtime):
+        try:
+            index = self._map(self.index_path)
+        except OSError:
+            return False
+        if len(index) < INDEX_HEADER.size:
+            if isinstance(index, mmap.mmap):
+                index.close()
+            return False
+        magic, indexed_size, indexed_mtime, count = INDEX_HEADER.unpack_from(index)
+        if (magic, indexed_size, indexed_mtime) != (INDEX_MAGIC, size, mtime) \
+                or len(index) != INDEX_HEADER.size + count * 8:
+            index.close()
+            return False
+        self.index_map = index
+        self.offsets = memoryview(index)[INDEX_HEADER.size:].cast("Q")
+        self.size, self.mtime = size, mtime
+        return True
+
+    def _scan(self, position, end):
+        """Offsets of the joke lines between position and end."""
+        offsets = array("Q")
+        with open(self.path, "rb") as f:
+            f.seek(position)
+            for line in f:
+                if position >= end:
+                    break  # written after the stat; the next scan gets it
+                if b"?" in line[:end - position]:  # the same test parse_joke makes
+                    offsets.append(position)
+                position += len(line)
+        return offsets
+
+    def _write_index(self, stat, *parts, path=None):
+        path = path or self.index_path
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, stat.st_size, stat.st_mtime_ns,
+                                      sum(len(part) for part in parts) // 8))
+            for part in parts:
+                f.write(part)
+        os.replace(tmp, path)
+
+    def _build_index(self, stat, path=None):
+        self._write_index(stat, self._scan(0, stat.st_size).tobytes(), path=path)
+
+    def appended(self, stat):
+        """True if the file at stat is the indexed file with more added on."""
+        if stat.st_size <= self.size:
+            return False
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self.size - len(self.mark))
+                return f.read(len(self.mark)) == self.mark
+        except OSError:
+            return False
+
+    def update_index(self, stat):
+        """Bring the saved index up to stat; safe to run off the UI thread.
+
+        Returns "appended" if only the new bytes were read, "rebuilt" if
+        the file had been truncated or rewritten. The index in use stays
+        mapped, so the new one is saved beside it (Windows will not replace
+        a mapped file); call reload(stat) on the UI thread to swap it in.
+        """
+        if not self.appended(stat):
+            self._build_index(stat, path=self.new_index_path)
+            return "rebuilt"
+        # The old last line may not have been finished: scan again from its start.
+        tail = self.data.rfind(b"\n", 0, self.size) + 1
+        keep = bisect.bisect_left(self.offsets, tail)
+        self._write_index(stat, self.offsets[:keep].tobytes(), self._scan(tail, stat.st_size).tobytes(),
+                          path=self.new_index_path)
+        return "appended"
+
+    def reload(self, stat):
+        """Switch to the index update_index wrote for stat.
+
+        The old mappings are released before the new index replaces the
+        old one. If that fails, the old index is mapped again and the
+        error is raised.
+        """
+        size, mtime = self.size, self.mtime
+        self.close()
+        try:
+            os.replace(self.new_index_path, self.index_path)
+        except OSError:
+            self._load_index(size, mtime)
+            self._map_data()
+            raise
+        self._load_index(stat.st_size, stat.st_mtime_ns)
+        self._map_data()
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def line(self, i):
+        start = self.offsets[i]
+        end = self.data.find(b"\n", start, self.size)
+        return bytes(self.data[start:end if end != -1 else self.size]).decode("utf-8", "replace")
+
+    def joke(self, i):
+        return parse_joke(self.line(i))
+
+    def random_joke(self, rng=random):
+        return self.joke(rng.randrange(len(self)))
+
+    def _close(self, offsets, index_map, data):
+        if isinstance(offsets, memoryview):
+            offsets.release()
+        for mapped in (index_map, data):
+            if isinstance(mapped, mmap.mmap):
+                mapped.close()
+
+    def close(self):
+        self._close(self.offsets, self.index_map, self.data)
+        self.offsets = ()
+        self.index_map = self.data = None
+
+# ================= Watching ================= #
+
+class JokeWatcher:
+    """Polls the jokes file and folds in changes without blocking Tk.
+
+    A stat every interval ms is all it costs while nothing changes. When
+    the file grows, only the appended bytes are read; a truncated or
+    rewritten file is indexed from scratch. Either way the reading happens
+    on a worker thread, and on_change(appended) is called on the UI thread
+    once the corpus has switched over.
+    """
+
+    def __init__(self, widget, corpus, on_change, on_error=None, interval=1000):
+        self.widget = widget
+        self.corpus = corpus
+        self.on_change = on_change
+        self.on_error = on_error
+        self.interval = interval
+        self.outcome = None
+        self.error = None
+        self.job = widget.after(interval, self.poll)
+
+    def poll(self):
+        try:
+            stat = os.stat(self.corpus.path)
+        except OSError:
+            stat = None  # being replaced; look again later
+        if stat is None or (stat.st_size, stat.st_mtime_ns) == (self.corpus.size, self.corpus.mtime):
+            self.job = self.widget.after(self.interval, self.poll)
+            return
+        worker = threading.Thread(target=self._update, args=(stat,), daemon=True)
+        worker.start()
+        self._wait(worker, stat)
+
+    def _update(self, stat):
+        try:
+            self.outcome = self.corpus.update_index(stat)
+        except OSError as error:
+            self.outcome = error
+
+    def _wait(self, worker, stat):
+        if worker.is_alive():
+            self.job = self.widget.after(20, self._wait, worker, stat)
+            return
+        outcome = self.outcome
+        if not isinstance(outcome, OSError):
+            try:
+                self.corpus.reload(stat)
+            except OSError as error:
+                outcome = error
+        if isinstance(outcome, OSError):
+            # Keep polling, but report a failure once, not every interval.
+            if self.error is None and self.on_error is not None:
+                self.on_error(outcome)
+            self.error = outcome
+        else:
+            self.error = None
+            self.on_change(outcome == "appended")
+        self.job = self.widget.after(self.interval, self.poll)
+
+    def stop(self):
+        if self.job is not None:
+            self.widget.after_cancel(self.job)
+            self.job = None
@@ -0,0 +1,190 @@
+import json
+import os
+import random
+from array import array
+
+# ================= Shuffle Bag ================= #
+
+class ShuffleBag:
+    """Draws 0..size-1 in a random order with no repeats until all are drawn.
+
+    The order is a keyed Feistel permutation, so nothing is shuffled up
+    front: drawing the n-th item just computes where n maps to. The whole
+    state is (seed, position, size), which makes it cheap to save. Items
+    added mid-round join from the next round.
+    """
+
+    ROUNDS = 4
+
+    def __init__(self, size, seed=None, position=0):
+        self.size = size
+        self.position = position
+        self.seed = random.getrandbits(64) if seed is None else seed
+        self._setup()
+
+    def _setup(self):
+        bits = max((self.size - 1).bit_length(), 2)
+        bits += bits % 2
+        self.half = bits // 2
+        self.mask = (1 << self.half) - 1
+        rng = random.Random(self.seed)
+        self.keys = [rng.getrandbits(32) for _ in range(self.ROUNDS)]
+
+    def _feistel(self, x):
+        left, right = x >> self.half, x & self.mask
+        for key in self.keys:
+            left, right = right, left ^ ((((right ^ key) * 0x9E3779B1) >> 7) & self.mask)
+        return (left << self.half) | right
+
+    def permute(self, i):
+        # Cycle-walk until the value lands inside 0..size-1 (at most a few steps).
+        x = self._feistel(i)
+        while x >= self.size:
+            x = self._feistel(x)
+        return x
+
+    def draw(self, size=None):
+        if self.position >= self.size:
+            # Round over: a fresh order, including any items added since.
+            self.seed = random.Random(self.seed).getrandbits(64)
+            self.position = 0
+            if size is not None:
+                self.size = size
+            self._setup()
+        item = self.permute(self.position)
+        self.position += 1
+        return item
+
+    def state(self):
+        return {"seed": self.seed, "position": self.position, "size": self.size}
+
+# ================= Weighted Picks ================= #
+
+class WeightedPicker:
+    """Weighted random draws from a Fenwick tree of weights.
+
+    Draws and weight updates are both O(log n); building is O(n).
+    """
+
+    def __init__(self, weights):
+        self.weights = array("d", weights)
+        self.tree = array("d", [0.0]) + self.weights
+        n = len(self.weights)
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                self.tree[parent] += self.tree[i]
+        self.top = 1 << n.bit_length() if n else 0
+
+    def __len__(self):
+        return len(self.weights)
+
+    def total(self):
+        total, i = 0.0, len(self.weights)
+        while i:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def set(self, index, weight):
+        delta = weight - self.weights[index]
+        self.weights[index] = weight
+        i = index + 1
+        while i <= len(self.weights):
+            self.tree[i] += delta
+            i += i & -i
+
+    def extend(self, count, weight=1.0):
+        for _ in range(count):
+            self.weights.append(0.0)
+            self.tree.append(0.0)
+            # The new node covers its own range; fill it from the smaller nodes.
+            i = len(self.weights)
+            low = i - (i & -i)
+            j = i - 1
+            while j > low:
+                self.tree[i] += self.tree[j]
+                j -= j & -j
+            self.set(i - 1, weight)
+        self.top = 1 << len(self.weights).bit_length()
+
+    def draw(self, rng=random):
+        target = rng.random() * self.total()
+        index, step = 0, self.top
+        while step:
+            nxt = index + step
+            if nxt <= len(self.weights) and self.tree[nxt] <= target:
+                index = nxt
+                target -= self.tree[nxt]
+            step >>= 1
+        return min(index, len(self.weights) - 1)
+
+# ================= Saved State ================= #
+
+class JokePicker:
+    """Chooses which joke comes next and remembers it between launches.
+
+    mode "bag" never repeats a joke until every one has been shown;
+    mode "weighted" favours jokes by rating. Ratings are kept either way,
+    together with the bag, in <jokes file>.state.
+    """
+
+    def __init__(self, count, state_path, mode="bag"):
+        self.state_path = state_path
+        self.mode = mode
+        state = self._load()
+        bag = state.get("bag")
+        if bag and bag["size"] <= count:
+            self.bag = ShuffleBag(bag["size"], bag["seed"], bag["position"])
+        else:
+            self.bag = ShuffleBag(count)
+        self.count = count
+        self.ratings = {int(i): w for i, w in state.get("ratings", {}).items() if int(i) < count}
+        self.weighted = None
+
+    def _load(self):
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        state = {"bag": self.bag.state(), "ratings": self.ratings}
+        tmp = self.state_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp, self.state_path)
+        except OSError:
+            pass  # read-only folder: just don't remember
+
+    def weights(self):
+        if self.weighted is None:
+            weights = array("d", [1.0]) * self.count
+            for i, weight in self.ratings.items():
+                weights[i] = weight
+            self.weighted = WeightedPicker(weights)
+        return self.weighted
+
+    def grow(self, count):
+        """More jokes were added to the file."""
+        if count > self.count and self.weighted is not None:
+            self.weighted.extend(count - self.count)
+        self.count = max(count, self.count)
+
+    def next(self):
+        if not self.count:
+            return None
+        if self.mode == "weighted":
+            index = self.weights().draw()
+        else:
+            index = self.bag.draw(self.count)
+        self.save()
+        return index
+
+    def rate(self, index, weight):
+        self.ratings[index] = weight
+        if self.weighted is not None:
+            self.weighted.set(index, weight)
+        self.save()
@@ -0,0 +1,316 @@
+import bisect
+import mmap
+import os
+import random
+import re
+import struct
+import threading
+from array import array
+from collections import OrderedDict
+
+from JokeCorpus import MARK_BYTES
+
+RECENT_QUERIES = 32
+
+# <jokes file>.words: header, sorted terms (utf-8, back to back), where
+# each term starts (terms + 1 entries), where each term's postings start
+# (terms + 1 entries), then the postings: sorted joke numbers per term.
+INDEX_HEADER = struct.Struct("<8sQqQQQ")  # magic, source size, mtime_ns, jokes, terms, term bytes
+INDEX_MAGIC = b"JOKEWRD1"
+WORD = re.compile(r"[a-z0-9']+")
+
+def words(text):
+    return WORD.findall(text.lower())
+
+class _Terms:
+    """The sorted term list as a sequence, read straight from the mapping."""
+
+    def __init__(self, blob, starts):
+        self.blob = blob
+        self.starts = starts
+
+    def __len__(self):
+        return len(self.starts) - 1
+
+    def __getitem__(self, i):
+        return bytes(self.blob[self.starts[i]:self.starts[i + 1]])
+
+def _map_index(path, size, mtime, jokes):
+    """(mapping, views, terms, posting starts, postings) of the index saved
+    at path for this corpus state, or None if there is none."""
+    try:
+        with open(path, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(mapping) < INDEX_HEADER.size:
+        mapping.close()
+        return None
+    magic, indexed_size, indexed_mtime, indexed_jokes, terms, term_bytes = INDEX_HEADER.unpack_from(mapping)
+    if (magic, indexed_size, indexed_mtime, indexed_jokes) != (INDEX_MAGIC, size, mtime, jokes):
+        mapping.close()
+        return None
+
+    view = memoryview(mapping)
+    at = INDEX_HEADER.size
+    blob = view[at:at + term_bytes]
+    at += term_bytes
+    at += -at % 8
+    term_starts = view[at:at + (terms + 1) * 8].cast("Q")
+    at += (terms + 1) * 8
+    posting_starts = view[at:at + (terms + 1) * 8].cast("Q")
+    at += (terms + 1) * 8
+    postings = view[at:].cast("I")
+    views = [postings, posting_starts, term_starts, blob, view]
+    return mapping, views, _Terms(blob, term_starts), posting_starts, postings
+
+def _merged(old, found, first):
+    """(term, old postings kept, new postings) in term order.
+
+    old is a mapped index, or None; its postings from joke first on are
+    dropped, as those jokes were read again into found.
+    """
+    added = sorted(found)
+    none = array("I")
+    j = 0
+    if old is not None:
+        _, _, terms, posting_starts, postings = old
+        for t in range(len(terms)):
+            term = terms[t]
+            while j < len(added) and added[j] < term:
+                yield added[j], none, found[added[j]]
+                j += 1
+            start = posting_starts[t]
+            kept = postings[start:bisect.bisect_left(postings, first, start, posting_starts[t + 1])]
+            new = none
+            if j < len(added) and added[j] == term:
+                new = found[term]
+                j += 1
+            if len(kept) or len(new):
+                yield term, kept, new
+    for term in added[j:]:
+        yield term, none, found[term]
+
+def _release(mapping, views):
+    for view in views:
+        view.release()
+    mapping.close()
+
+class JokeIndex:
+    """Inverted index from words to the jokes that contain them.
+
+    Saved next to the jokes file and memory-mapped. refresh() brings it
+    up to the corpus on a worker thread and swaps it in on the UI thread:
+    when jokes were only appended, just those are read and their postings
+    merged into the saved ones; otherwise every joke is read again.
+    Every word of a query matches any term it is a prefix of ("pizza"
+    finds "pizzas"), and all words must match. A one-term match is
+    returned straight from the mapping without copying.
+    """
+
+    def __init__(self, corpus, index_path=None):
+        self.corpus = corpus
+        self.index_path = index_path or corpus.path + ".words"
+        self.new_index_path = self.index_path + ".new"  # written by a refresh, swapped in by _wait
+        self.mapping = None
+        self.views = []
+        self.size = self.mtime = None  # the corpus state the loaded index covers
+        self.jokes = 0
+        self.mark = b""                # the corpus's last bytes then, to tell an append from a rewrite
+        self.recent = OrderedDict()    # query -> result, so repeated draws are O(1)
+        self.pending = None            # (callback, on_error) for a refresh in progress
+        self.error = None              # what the last build raised, if anything
+        self._load(self.index_path, corpus.size, corpus.mtime, len(corpus), self._corpus_mark())
+
+    @property
+    def ready(self):
+        """True if there is an index to search."""
+        return self.mapping is not None
+
+    def current(self):
+        """True if the loaded index covers the corpus as it is now."""
+        return self.ready and (self.size, self.mtime) == (self.corpus.size, self.corpus.mtime)
+
+    def _corpus_mark(self):
+        return bytes(self.corpus.data[max(self.corpus.size - MARK_BYTES, 0):self.corpus.size]) if self.corpus.data else b""
+
+    def appended(self):
+        """True if the corpus is what the loaded index covers with jokes added on."""
+        size = self.corpus.size
+        if not self.ready or size <= self.size:
+            return False
+        return bytes(self.corpus.data[self.size - len(self.mark):self.size]) == self.mark
+
+    def _load(self, path, size, mtime, jokes, mark):
+        index = _map_index(path, size, mtime, jokes)
+        if index is None:
+            return False
+        self.mapping, self.views, self.terms, self.posting_starts, self.postings = index
+        self.size, self.mtime, self.jokes, self.mark = size, mtime, jokes, mark
+        return True
+
+    def refresh(self, widget, callback, on_error=None):
+        """Bring the index up to the corpus off the UI thread, then call callback().
+
+        Searches keep using the loaded index meanwhile if the file has only
+        grown; after a rewrite its joke numbers mean nothing, so it is
+        dropped at once. If building fails, on_error(exception) is called
+        instead.
+        """
+        if self.current():
+            callback()
+            return
+        if not self.appended():
+            self.close()
+        busy = self.pending is not None
+        self.pending = (callback, on_error)
+        if not busy:
+            self._start_build(widget)
+
+    def _start_build(self, widget):
+        # The worker reads the jokes file through its own mapping, since
+        # the corpus may swap its mappings while the build runs.
+        corpus = self.corpus
+        base = (self.size, self.mtime, self.jokes) if self.appended() else None
+        job = (array("Q", corpus.offsets), corpus.size, corpus.mtime, self._corpus_mark(), base)
+        self.error = None
+        worker = threading.Thread(target=self._build, args=job, daemon=True)
+        worker.start()
+        self._wait(widget, worker, job)
+
+    def _wait(self, widget, worker, job):
+        if worker.is_alive():
+            widget.after(20, self._wait, widget, worker, job)
+            return
+        offsets, size, mtime, mark, _ = job
+        if self.error is None:
+            # Unmap the old index first: Windows will not replace a mapped file.
+            old = (self.size, self.mtime, self.jokes, self.mark)
+            self.close()
+            try:
+                os.replace(self.new_index_path, self.index_path)
+            except OSError as error:
+                self.error = error
+                self._load(self.index_path, *old)
+            else:
+                self._load(self.index_path, size, mtime, len(offsets), mark)
+        callback, on_error = self.pending
+        if self.error is not None:
+            self.pending = None
+            if on_error is not None:
+                on_error(self.error)
+        elif not self.current():
+            # The file changed again while this build ran.
+            if not self.appended():
+                self.close()
+            self._start_build(widget)
+        else:
+            self.pending = None
+            callback()
+
+    def _build(self, offsets, size, mtime, mark, base):
+        try:
+            self._write_index(offsets, size, mtime, base)
+        except (OSError, ValueError) as error:
+            self.error = error
+
+    def _write_index(self, offsets, size, mtime, base):
+        # base is the (size, mtime, jokes) of the saved index if the
+        # corpus has only grown since; its postings are kept, and only the
+        # jokes after them are read. The worker maps the saved index
+        # itself, since the UI thread may close its own mapping meanwhile.
+        old = _map_index(self.index_path, *base) if base is not None else None
+        try:
+            found = {}
+            with open(self.corpus.path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+            try:
+                first = 0
+                if old is not None:
+                    # The old last line may not have been finished: read it again.
+                    tail = data.rfind(b"\n", 0, base[0]) + 1
+                    first = min(bisect.bisect_left(offsets, tail), base[2])
+                for i in range(first, len(offsets)):
+                    start = offsets[i]
+                    end = data.find(b"\n", start, size)
+                    line = bytes(data[start:end if end != -1 else size]).decode("utf-8", "replace")
+                    for word in set(words(line)):
+                        found.setdefault(word.encode(), array("I")).append(i)
+            finally:
+                if isinstance(data, mmap.mmap):
+                    data.close()
+            entries = list(_merged(old, found, first))
+            blob = bytearray()
+            term_starts, posting_starts = array("Q", [0]), array("Q", [0])
+            for term, kept, added in entries:
+                blob += term
+                term_starts.append(len(blob))
+                posting_starts.append(posting_starts[-1] + len(kept) + len(added))
+
+            tmp = self.new_index_path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(INDEX_HEADER.pack(INDEX_MAGIC, size, mtime, len(offsets), len(entries), len(blob)))
+                f.write(blob)
+                f.write(b"\0" * (-(INDEX_HEADER.size + len(blob)) % 8))
+                f.write(term_starts.tobytes())
+                f.write(posting_starts.tobytes())
+                for term, kept, added in entries:
+                    f.write(kept)
+                    f.write(added)
+            os.replace(tmp, self.new_index_path)
+        finally:
+            if old is not None:
+                entries = kept = None  # slices of the old mapping
+                _release(old[0], old[1])
+
+    def _postings(self, t):
+        return self.postings[self.posting_starts[t]:self.posting_starts[t + 1]]
+
+    def matching(self, prefix):
+        """Sorted jokes containing a word that starts with prefix."""
+        key = prefix.encode()
+        first = bisect.bisect_left(self.terms, key)
+        last = bisect.bisect_left(self.terms, key + b"\xff", first)  # no utf-8 byte is 0xff
+        if last - first == 1:
+            return self._postings(first)
+        # Neighbouring terms have neighbouring postings: merge one slice.
+        jokes = array("I")
+        jokes.frombytes(self.postings[self.posting_starts[first]:self.posting_starts[last]].tobytes())
+        return array("I", sorted(set(jokes)))
+
+    def search(self, query):
+        """Sorted joke numbers matching every word of query (none for an empty query)."""
+        key = " ".join(words(query))
+        if key in self.recent:
+            self.recent.move_to_end(key)
+            return self.recent[key]
+        lists = sorted((self.matching(word) for word in key.split()), key=len)
+        result = lists[0] if lists else array("I")
+        for other in lists[1:]:
+            if len(result) * len(other).bit_length() < len(other):
+                # Far shorter: walk it and binary-search the long one.
+                kept = array("I")
+                for joke in result:
+                    at = bisect.bisect_left(other, joke)
+                    if at < len(other) and other[at] == joke:
+                        kept.append(joke)
+            else:
+                kept = array("I", sorted(set(result).intersection(other)))
+            result = kept
+            if not result:
+                break
+        self.recent[key] = result
+        if len(self.recent) > RECENT_QUERIES:
+            self.recent.popitem(last=False)
+        return result
+
+    def random_match(self, query, rng=random):
+        matches = self.search(query)
+        return matches[rng.randrange(len(matches))] if len(matches) else None
+
+    def close(self):
+        self.recent.clear()
+        if self.mapping is not None:
+            _release(self.mapping, self.views)
+            self.mapping = None
+            self.views = []
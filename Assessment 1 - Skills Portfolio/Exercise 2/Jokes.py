@@ -1,8 +1,17 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Shared"))
+import Startup  # first, so --profile-startup times the imports below
+
 import tkinter as tk
 from tkinter import messagebox
-from PIL import Image, ImageTk
-import os
-import random
+
+from JokeBackground import ScaledBackground
+from JokeCorpus import JokeCorpus, JokeWatcher
+from JokePicker import JokePicker
+from JokeSearch import JokeIndex
+from RoundedSprites import rounded_sprite
 
 class PrettyButton(tk.Canvas):
     def __init__(self, parent, text, command=None, bg_color="#4CAF50", hover_color="#45a049", text_color="white", width=150, height=40):
@@ -16,7 +25,10 @@ class PrettyButton(tk.Canvas):
         self.height = height
 
 
-        self.rounded_rect = self.create_rounded_rect(0, 0, width, height, 20, fill=bg_color, outline="")
+        # Both looks are shared sprites, so hovering only swaps the image.
+        self.sprite = rounded_sprite(self, width, height, 20, bg_color, self["bg"])
+        self.hover_sprite = rounded_sprite(self, width, height, 20, hover_color, self["bg"])
+        self.rounded_rect = self.create_image(0, 0, image=self.sprite, anchor="nw")
 
     
         self.text_item = self.create_text(
@@ -37,23 +49,10 @@ class PrettyButton(tk.Canvas):
             self.command()
 
     def on_enter(self, event):
-        self.itemconfig(self.rounded_rect, fill=self.hover_color)
+        self.itemconfig(self.rounded_rect, image=self.hover_sprite)
 
     def on_leave(self, event):
-        self.itemconfig(self.rounded_rect, fill=self.bg_color)
-
-    def create_rounded_rect(self, x1, y1, x2, y2, radius=25, **kwargs):
-        points = [
-            x1 + radius, y1,
-            x2 - radius, y1,
-            x2, y1 + radius,
-            x2, y2 - radius,
-            x2 - radius, y2,
-            x1 + radius, y2,
-            x1, y2 - radius,
-            x1, y1 + radius
-        ]
-        return self.create_polygon(points, smooth=True, **kwargs)
+        self.itemconfig(self.rounded_rect, image=self.sprite)
 
 
 
@@ -63,30 +62,70 @@ class JokeMachineApp:
         self.root.title("Alexa Joke Machine")
         self.root.geometry("650x380")
 
-    
-        self.load_background()
-
-   
-        self.jokes = self.load_jokes()
+        self.jokes = []
+        self.picker = None
+        self.search = None
         self.current = None
+        self.current_index = None
+        self.draw_when_indexed = False
 
      
         self.build_start_screen()
 
+        # The window shows first; the background and jokes load right after.
+        Startup.after_first_frame(self.root, ("background", self.load_background), ("jokes", self.load_data))
+
+    def load_data(self):
+        self.jokes = self.load_jokes()
+        self.picker = self.load_picker()
+        if self.jokes:
+            # Jokes added to the file while the app is open show up without a restart.
+            self.watcher = JokeWatcher(self.root, self.jokes, self.jokes_changed, self.jokes_update_failed)
+
     def load_background(self):
         try:
             bg_path = os.path.join(os.path.dirname(__file__), "background.jpg")
 
-            img = Image.open(bg_path)
-            img = img.resize((650, 380))
-            self.bg_img = ImageTk.PhotoImage(img)
+            self.background = ScaledBackground(self.root, bg_path)
+            self.bg_img = None
 
-            self.bg_label = tk.Label(self.root, image=self.bg_img)
+            self.bg_label = tk.Label(self.root)
             self.bg_label.place(x=0, y=0, relwidth=1, relheight=1)
+            self.bg_label.lower()
+            self.resize_job = None
+            self.root.bind("<Configure>", self.on_resize)
+            # Scaled off the UI thread the first time; later runs read .cache/.
+            self.fit_background()
 
         except:
             messagebox.showerror("Error", "background.jpg not found!")
 
+    def on_resize(self, event):
+        # Wait for the window to settle, then swap in a copy at the new size.
+        if event.widget is not self.root:
+            return
+        if self.resize_job is not None:
+            self.root.after_cancel(self.resize_job)
+        self.resize_job = self.root.after(100, self.fit_background)
+
+    def fit_background(self):
+        self.resize_job = None
+        if self.background is None:
+            return
+        width, height = self.root.winfo_width(), self.root.winfo_height()
+        shown = (self.bg_img.width(), self.bg_img.height()) if self.bg_img else None
+        if (width, height) != shown and width > 1 and height > 1:
+            self.background.request(width, height, self.show_background, self.background_failed)
+
+    def background_failed(self, error):
+        # Keep the plain window background rather than trying again.
+        self.background = None
+        messagebox.showerror("Error", f"Could not load background.jpg:\n{error}")
+
+    def show_background(self, image):
+        self.bg_img = image
+        self.bg_label.config(image=image)
+
     def build_start_screen(self):
         self.start_frame = tk.Frame(self.root, bg="white")
         self.start_frame.place(relx=0.5, rely=0.5, anchor="center")
@@ -135,6 +174,13 @@ class JokeMachineApp:
         )
         self.punch_label.pack(pady=10)
 
+        filter_frame = tk.Frame(main_frame, bg="white")
+        filter_frame.pack()
+        tk.Label(filter_frame, text="Jokes about:", font=("Arial", 11), bg="white").grid(row=0, column=0, padx=5)
+        self.filter_entry = tk.Entry(filter_frame, font=("Arial", 11), width=24)
+        self.filter_entry.grid(row=0, column=1, padx=5)
+        self.filter_entry.bind("<Return>", lambda event: self.new_joke())
+
         btn_frame = tk.Frame(main_frame, bg="white")
         btn_frame.pack(pady=10)
 
@@ -162,6 +208,27 @@ class JokeMachineApp:
         )
         self.show_btn.grid(row=0, column=1, padx=7)
 
+        rate_frame = tk.Frame(main_frame, bg="white")
+        rate_frame.pack()
+        PrettyButton(
+            rate_frame,
+            text="😂 Funny",
+            bg_color="#9b59b6",
+            hover_color="#8e44ad",
+            width=110,
+            height=32,
+            command=lambda: self.rate_joke(2.0)
+        ).grid(row=0, column=0, padx=7)
+        PrettyButton(
+            rate_frame,
+            text="😐 Meh",
+            bg_color="#95a5a6",
+            hover_color="#7f8c8d",
+            width=110,
+            height=32,
+            command=lambda: self.rate_joke(0.5)
+        ).grid(row=0, column=1, padx=7)
+
       
         quit_btn = PrettyButton(
             main_frame,
@@ -178,28 +245,85 @@ class JokeMachineApp:
         try:
             file_path = os.path.join(os.path.dirname(__file__), "randomJokes.txt")
 
-            jokes = []
-            with open(file_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if "?" in line:
-                        setup, punch = line.split("?", 1)
-                        jokes.append((setup + "?", punch.strip()))
-            return jokes
+            # Memory-mapped with a saved line index; jokes are decoded on demand.
+            return JokeCorpus(file_path)
 
         except:
             messagebox.showerror("Error", "randomJokes.txt not found!")
             return []
 
+    def load_picker(self):
+        # Which jokes were already shown, and ratings, survive restarts.
+        # --weighted picks by rating instead of working through every joke.
+        state_path = os.path.join(os.path.dirname(__file__), "randomJokes.txt.state")
+        return JokePicker(len(self.jokes), state_path, "weighted" if "--weighted" in sys.argv else "bag")
+
+    def jokes_changed(self, appended):
+        if appended and len(self.jokes) >= self.picker.count:
+            self.picker.grow(len(self.jokes))
+        else:
+            # Rewritten: the old bag and ratings may not fit any more.
+            self.picker = self.load_picker()
+        if self.search is not None:
+            self.search.refresh(self.root, self.search_ready, self.search_failed)
+
+    def jokes_update_failed(self, error):
+        messagebox.showerror("Error", f"Could not reload randomJokes.txt:\n{error}")
+
+    def load_search(self):
+        # Word index saved as randomJokes.txt.words, built on a worker thread
+        # the first time a filter is used.
+        if self.search is None:
+            self.search = JokeIndex(self.jokes)
+        if not self.search.current():
+            self.search.refresh(self.root, self.search_ready, self.search_failed)
+        return self.search
+
+    def search_ready(self):
+        if self.draw_when_indexed:
+            self.draw_when_indexed = False
+            self.new_joke()
+
+    def search_failed(self, error):
+        self.draw_when_indexed = False
+        self.setup_label.config(text="")
+        messagebox.showerror("Error", f"Could not index randomJokes.txt:\n{error}")
+
     def new_joke(self):
         if not self.jokes:
             self.setup_label.config(text="No jokes found.")
             return
 
-        self.current = random.choice(self.jokes)
+        about = self.filter_entry.get().strip()
+        if about:
+            search = self.load_search()
+            if not search.ready:
+                # Drawn as soon as the index is built.
+                self.setup_label.config(text="Indexing jokes...")
+                self.punch_label.config(text="")
+                self.current = self.current_index = None
+                self.draw_when_indexed = True
+                return
+            index = search.random_match(about)
+            if index is None:
+                self.setup_label.config(text=f"No jokes about '{about}'.")
+                self.punch_label.config(text="")
+                self.current = self.current_index = None
+                return
+            self.current_index = index
+        else:
+            self.current_index = self.picker.next()
+        self.current = self.jokes.joke(self.current_index)
         self.setup_label.config(text=self.current[0])
         self.punch_label.config(text="")
 
+    def rate_joke(self, factor):
+        # Each rating doubles or halves the joke's weight, within 1/16-16.
+        if self.current_index is None:
+            return
+        weight = self.picker.ratings.get(self.current_index, 1.0) * factor
+        self.picker.rate(self.current_index, min(max(weight, 1 / 16), 16.0))
+
     def show_punchline(self):
         if self.current:
             self.punch_label.config(text=self.current[1])
@@ -208,5 +332,8 @@ class JokeMachineApp:
 
 if __name__ == "__main__":
     root = tk.Tk()
+    if "--profile-trace" in sys.argv:
+        import TkProfiler
+        TkProfiler.install(root, sys.argv[sys.argv.index("--profile-trace") + 1])
     app = JokeMachineApp(root)
     root.mainloop()
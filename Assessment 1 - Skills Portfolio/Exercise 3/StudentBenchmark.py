@@ -0,0 +1,285 @@
+"""Synthetic cohorts and a benchmark harness for the Student Manager.
+
+    python StudentBenchmark.py generate --rows 1000000 --seed 7 --output big.txt
+    python StudentBenchmark.py run --sizes 10 10000 1000000 --output results.json
+    python StudentBenchmark.py run --baseline results.json --tolerance 0.25
+    python StudentBenchmark.py run --tk          # also time the Tk record view
+
+Each operation is timed (best of --repeat runs) and then run once more
+under tracemalloc for its peak memory. Results are written as JSON; given
+a baseline file, any operation slower than the baseline by more than the
+tolerance is reported and the exit status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from itertools import islice
+
+from StudentFiles import StudentJournal, format_marks, read_marks, write_marks
+from StudentStore import SORT_KEYS, StudentTable, sorted_rows
+
+FIRST_NAMES = ["Alan", "Lee", "Les", "Matt", "Sam", "Ron", "Jo", "John", "Jake", "Gareth",
+               "Amira", "Priya", "Chen", "Fatima", "Olu", "Nina", "Tom", "Aisha", "Ben", "Zara"]
+LAST_NAMES = ["Shearer", "Scott", "Ferdinand", "Thompson", "Sturtivant", "Herrema", "Hyde",
+              "Curry", "Hobbs", "Southgate", "Khan", "Patel", "Wei", "Okafor", "Silva",
+              "Nowak", "Murphy", "Haddad", "Jones", "Kowalski"]
+
+
+# -----------------------------
+# Synthetic Cohorts
+# -----------------------------
+def generate_cohort(path, rows, seed=0):
+    """Write a studentMarks.txt-style file with rows random students."""
+    rnd = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write(f"{rows}\n")
+        batch = []
+        for _ in range(rows):
+            batch.append(f"{rnd.randint(1000, 9999)},"
+                         f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)},"
+                         f"{rnd.randint(0, 20)},{rnd.randint(0, 20)},{rnd.randint(0, 20)},"
+                         f"{rnd.randint(0, 100)}\n")
+            if len(batch) == 10000:
+                f.writelines(batch)
+                batch.clear()
+        f.writelines(batch)
+
+
+# -----------------------------
+# Operations
+# -----------------------------
+# Each operation takes (path, table, rnd) and returns how many operations it
+# performed, for the ops/sec figure. The table is freshly loaded from path.
+def op_load(path, table, rnd):
+    read_marks(path, StudentTable())
+    return 1
+
+
+def op_save(path, table, rnd):
+    write_marks(path + ".bench", format_marks(table))
+    os.remove(path + ".bench")
+    return 1
+
+
+def op_journal_edits(path, table, rnd):
+    journal = StudentJournal(path + ".bench")
+    journal.open(table, 0)
+    with journal.batch():
+        for i in range(100):
+            table.add("1000", f"Bench {i}", 10, 10, 10, 50)
+            journal.add("1000", f"Bench {i}", 10, 10, 10, 50)
+    journal.close()
+    for suffix in (".bench.journal", ".bench.journal.old", ".bench"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return 100
+
+
+def op_view_all(path, table, rnd):
+    # What View All Records does headless: summary figures plus one page.
+    table.average()
+    table.stats.median()
+    table.stats.top(3)
+    for row in islice(table.rows(), 40):
+        str(table.student(row))
+    return 1
+
+
+def op_lookups(path, table, rnd):
+    codes = [table.codes[rnd.randrange(len(table.codes))] for _ in range(200)]
+    for code in codes:
+        table.find(code)
+        table.starts_with(code[:2], limit=20)
+    return 400
+
+
+def op_aggregates(path, table, rnd):
+    for _ in range(1000):
+        table.average()
+        table.highest()
+        table.lowest()
+    return 3000
+
+
+def op_sorted_view(path, table, rnd):
+    for key in SORT_KEYS:
+        for reverse in (False, True):
+            sorted_rows(table, key, reverse)[:40]
+    return 2 * len(SORT_KEYS)
+
+
+def op_physical_sort(path, table, rnd):
+    table.sort(reverse=True)
+    return 1
+
+
+OPERATIONS = {
+    "load": op_load,
+    "save": op_save,
+    "journal_edits": op_journal_edits,
+    "view_all": op_view_all,
+    "lookups": op_lookups,
+    "aggregates": op_aggregates,
+    "sorted_view": op_sorted_view,
+    "physical_sort": op_physical_sort,
+}
+
+
+def tk_available():
+    try:
+        import tkinter as tk
+        tk.Tk().destroy()
+    except Exception:
+        return False
+    return True
+
+
+def tk_record_view(path, table, rnd):
+    """Show the table in a real RecordView and scroll through ten pages."""
+    import tkinter as tk
+    from StudentData import RecordView
+
+    root = tk.Tk()
+    root.geometry("800x600")
+    view = RecordView(root)
+    view.pack(fill="both", expand=True)
+    root.update()
+    view.show(table)
+    root.update_idletasks()
+    for _ in range(10):
+        view.scroll(view.page_size())
+        root.update_idletasks()
+    view.sort_by("name")
+    root.update_idletasks()
+    root.destroy()
+    return 12
+
+
+# -----------------------------
+# Harness
+# -----------------------------
+def measure(operation, path, repeat, seed):
+    """Best wall time over repeat runs, then peak memory from one traced run."""
+    times = []
+    count = 0
+    for _ in range(repeat):
+        table = StudentTable()
+        read_marks(path, table)
+        rnd = random.Random(seed)
+        start = time.perf_counter()
+        count = operation(path, table, rnd)
+        times.append(time.perf_counter() - start)
+
+    table = StudentTable()
+    read_marks(path, table)
+    tracemalloc.start()
+    operation(path, table, random.Random(seed))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = min(times)
+    return {"seconds": best, "peak_bytes": peak,
+            "ops_per_second": count / best if best else None}
+
+
+def run(sizes, operations, repeat, seed, workdir):
+    results = []
+    for size in sizes:
+        path = os.path.join(workdir, f"cohort_{size}.txt")
+        if not os.path.exists(path):
+            generate_cohort(path, size, seed)
+        for name, operation in operations.items():
+            result = measure(operation, path, repeat, seed)
+            result.update(operation=name, rows=size)
+            results.append(result)
+            print(f"{name:>16} {size:>10} rows  {result['seconds'] * 1000:10.2f} ms"
+                  f"  {result['peak_bytes'] / 1e6:8.2f} MB peak", file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Operations that got slower than baseline by more than tolerance."""
+    before = {(r["operation"], r["rows"]): r["seconds"] for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        old = before.get((r["operation"], r["rows"]))
+        if old and r["seconds"] > old * (1 + tolerance):
+            regressions.append({"operation": r["operation"], "rows": r["rows"],
+                                "baseline": old, "seconds": r["seconds"],
+                                "slowdown": r["seconds"] / old})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Student Manager benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    gen = commands.add_parser("generate", help="write a synthetic marks file")
+    gen.add_argument("--rows", type=int, required=True)
+    gen.add_argument("--seed", type=int, default=0)
+    gen.add_argument("--output", required=True)
+
+    bench = commands.add_parser("run", help="time every operation at several sizes")
+    bench.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000])
+    bench.add_argument("--only", nargs="+", choices=sorted(OPERATIONS),
+                       help="run just these operations")
+    bench.add_argument("--repeat", type=int, default=3)
+    bench.add_argument("--seed", type=int, default=0)
+    bench.add_argument("--tk", action="store_true", help="also time the Tk record view")
+    bench.add_argument("--workdir", help="keep generated cohorts here (default: temp dir)")
+    bench.add_argument("--output", help="write results JSON here")
+    bench.add_argument("--baseline", help="results JSON to compare against")
+    bench.add_argument("--tolerance", type=float, default=0.25,
+                       help="allowed slowdown before flagging, e.g. 0.25 = 25%%")
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        generate_cohort(args.output, args.rows, args.seed)
+        return 0
+
+    operations = {name: OPERATIONS[name] for name in args.only or OPERATIONS}
+    if args.tk:
+        if tk_available():
+            operations["tk_record_view"] = tk_record_view
+        else:
+            print("No display available, skipping the Tk record view.", file=sys.stderr)
+
+    if args.workdir:
+        os.makedirs(args.workdir, exist_ok=True)
+        results = run(args.sizes, operations, args.repeat, args.seed, args.workdir)
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            results = run(args.sizes, operations, args.repeat, args.seed, workdir)
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": args.seed,
+        "results": results,
+    }
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["regressions"] = compare(results, json.load(f), args.tolerance)
+        for r in report["regressions"]:
+            print(f"REGRESSION {r['operation']} at {r['rows']} rows: "
+                  f"{r['slowdown']:.2f}x slower than baseline", file=sys.stderr)
+        status = 1 if report["regressions"] else 0
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,59 +1,303 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Shared"))
+import Startup  # first, so --profile-startup times the imports below
+
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
-import os
+import queue
+import threading
+import time
+import zlib
+
+from StudentFiles import (MappedStudentTable, MarksLoad, StudentJournal, format_binary,
+                          format_marks, stream_marks, write_marks)
+from StudentStore import StudentTable, check_text, sorted_rows
+
+# Files bigger than this are parsed on a process pool.
+PARALLEL_BYTES = 32 << 20
+# Chunk size for loading from the UI; keeps each table update short.
+UI_CHUNK_BYTES = 64 << 10
 
 # -----------------------------
-# Student Class
+# Record View
 # -----------------------------
-class Student:
-    def __init__(self, code, name, c1, c2, c3, exam):
-        self.code = code.strip()
-        self.name = name.strip()
-        self.c1 = int(c1)
-        self.c2 = int(c2)
-        self.c3 = int(c3)
-        self.exam = int(exam)
-
-    def coursework_total(self):
-        return self.c1 + self.c2 + self.c3
-
-    def overall_percentage(self):
-        return round(((self.coursework_total() + self.exam) / 160) * 100, 2)
-
-    def grade(self):
-        pct = self.overall_percentage()
-        if pct >= 70: return "A"
-        elif pct >= 60: return "B"
-        elif pct >= 50: return "C"
-        elif pct >= 40: return "D"
-        else: return "F"
-
-    def __str__(self):
-        return (
-            f"Name: {self.name}\n"
-            f"Code: {self.code}\n"
-            f"Coursework Total: {self.coursework_total()}/60\n"
-            f"Exam Mark: {self.exam}/100\n"
-            f"Overall Percentage: {self.overall_percentage()}%\n"
-            f"Grade: {self.grade()}\n"
-            "-----------------------------"
-        )
+class RecordView(tk.Frame):
+    """Table of student records that only ever holds the rows on screen.
+
+    The Treeview gets one item per visible line. Scrolling and resizing
+    just rewrite those items' values from the current row order, so the
+    cost of drawing does not depend on the size of the cohort. Clicking a
+    column heading re-orders by that column the same way.
+    """
+    COLUMNS = [
+        ("name", "Name", 220),
+        ("code", "Code", 80),
+        ("coursework", "Coursework", 100),
+        ("exam", "Exam", 80),
+        ("pct", "Overall %", 100),
+        ("grade", "Grade", 70),
+    ]
+    ROW_HEIGHT = 22
+
+    def __init__(self, parent):
+        super().__init__(parent, bg="#2A2A2A")
+        style = ttk.Style(self)
+        style.configure("Records.Treeview", rowheight=self.ROW_HEIGHT, font=("Courier", 11),
+                        background="#2A2A2A", fieldbackground="#2A2A2A", foreground="white")
+        style.configure("Records.Treeview.Heading", font=("Arial", 10, "bold"))
+
+        self.tree = ttk.Treeview(self, columns=[c for c, _, _ in self.COLUMNS],
+                                 show="headings", selectmode="browse",
+                                 style="Records.Treeview")
+        for column, heading, width in self.COLUMNS:
+            anchor = "w" if column == "name" else "center"
+            self.tree.heading(column, text=heading, command=lambda c=column: self.sort_by(c))
+            self.tree.column(column, width=width, anchor=anchor)
+
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<MouseWheel>", self.on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3))
+
+        self.table = None
+        self.order = range(0)
+        self.top = 0
+        self.items = []
+        self.sort_column = None
+        self.sort_reverse = False
+
+    def show(self, table, order=None, sort_column=None, reverse=False):
+        """Display table in the given row order (file order by default)."""
+        self.table = table
+        self.sort_column = sort_column
+        self.sort_reverse = reverse
+        if order is None:
+            order = table.rows()
+        self.order = order if hasattr(order, "__getitem__") else list(order)
+        self.scroll_to(self.top)
+
+    def sort_by(self, column):
+        if self.table is None:
+            return
+        self.sort_reverse = column == self.sort_column and not self.sort_reverse
+        self.sort_column = column
+        self.order = sorted_rows(self.table, column, self.sort_reverse)
+        self.scroll_to(0)
+
+    # -----------------------------
+    # Scrolling
+    # -----------------------------
+    def page_size(self):
+        return max(1, self.tree.winfo_height() // self.ROW_HEIGHT - 1)
+
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.order)))
+        elif args[0] == "scroll":
+            step = self.page_size() if args[2] == "pages" else 1
+            self.scroll(int(args[1]) * step)
+
+    def on_wheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def on_resize(self, event):
+        self.scroll_to(self.top)
+
+    def scroll(self, rows):
+        self.scroll_to(self.top + rows)
+
+    def scroll_to(self, top):
+        page = self.page_size()
+        self.top = max(0, min(top, len(self.order) - page))
+        self.refresh()
+
+    def refresh(self):
+        """Rewrite the visible items from the current order."""
+        page = self.page_size()
+        visible = self.order[self.top:self.top + page]
+
+        while len(self.items) < len(visible):
+            self.items.append(self.tree.insert("", "end"))
+        while len(self.items) > len(visible):
+            self.tree.delete(self.items.pop())
+
+        for item, row in zip(self.items, visible):
+            s = self.table.student(row)
+            self.tree.item(item, values=(s.name, s.code, f"{s.coursework_total()}/60",
+                                         f"{s.exam}/100", f"{s.overall_percentage()}%",
+                                         s.grade()))
+
+        total = len(self.order)
+        if total:
+            self.scrollbar.set(self.top / total, (self.top + len(visible)) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+
+# -----------------------------
+# Background Worker
+# -----------------------------
+class Job:
+    """Handle for one piece of background work.
+
+    The job function receives the Job as its first argument, so it can
+    check cancelled between steps and send progress back to the Tk thread.
+    Exactly one of on_done(result), on_error(exception) or on_cancel(job)
+    is called when it ends. Writer jobs always run to the end.
+    """
+
+    def __init__(self, worker, label, on_done, on_error, on_progress, on_cancel=None, writer=False):
+        self.worker = worker
+        self.label = label
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.on_cancel = on_cancel
+        self.writer = writer
+        self.fraction = None
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def progress(self, value=None, fraction=None):
+        """Report progress; value is passed to on_progress on the Tk thread."""
+        self.fraction = fraction
+        self.worker.results.put((self, "progress", value))
+
+
+class BackgroundWorker:
+    """Runs slow jobs off the Tk thread and hands their results back to it.
+
+    Reads and reports share a small thread pool. Writes go to one writer
+    thread, so they run strictly in the order they were submitted and never
+    interleave. Results, errors and progress come back through a queue that
+    is drained from after() for at most BUDGET seconds per poll, so the
+    event loop keeps its latency however much work is queued.
+    """
+    POLL_MS = 30
+    BUDGET = 0.02
+
+    def __init__(self, root, on_busy=None):
+        self.root = root
+        self.on_busy = on_busy
+        self.pools = {}  # started on first use, so concurrent.futures loads after startup
+        self.results = queue.Queue()
+        self.active = []
+        self.polling = False
+
+    def submit(self, fn, *args, label="", writer=False,
+               on_done=None, on_error=None, on_progress=None, on_cancel=None):
+        job = Job(self, label, on_done, on_error, on_progress, on_cancel, writer)
+        self.active.append(job)
+        self._pool("writer" if writer else "io").submit(self._run, job, fn, args)
+        self._busy_changed()
+        if not self.polling:
+            self.polling = True
+            self.root.after(self.POLL_MS, self._poll)
+        return job
+
+    def _pool(self, name):
+        if name not in self.pools:
+            from concurrent.futures import ThreadPoolExecutor
+            self.pools[name] = ThreadPoolExecutor(1 if name == "writer" else 2, thread_name_prefix=f"student-{name}")
+        return self.pools[name]
+
+    def _run(self, job, fn, args):
+        # A skipped write could leave a journal waiting forever for its snapshot.
+        if job.cancelled and not job.writer:
+            self.results.put((job, "cancelled", None))
+            return
+        try:
+            result = fn(job, *args)
+        except Exception as e:
+            self.results.put((job, "error", e))
+        else:
+            self.results.put((job, "cancelled" if job.cancelled else "done", result))
+
+    def _poll(self):
+        deadline = time.perf_counter() + self.BUDGET
+        while time.perf_counter() < deadline:
+            try:
+                job, kind, value = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                if job.on_progress and not job.cancelled:
+                    job.on_progress(value)
+                continue
+
+            self.active.remove(job)
+            if kind == "done" and job.on_done:
+                job.on_done(value)
+            elif kind == "cancelled" and job.on_cancel:
+                job.on_cancel(job)
+            elif kind == "error":
+                if job.on_error:
+                    job.on_error(value)
+                else:
+                    messagebox.showerror("Error", f"{job.label} failed:\n{value}")
+            self._busy_changed()
+
+        if self.active or not self.results.empty():
+            self.root.after(self.POLL_MS, self._poll)
+        else:
+            self.polling = False
+        if self.active:
+            self._busy_changed()
+
+    def _busy_changed(self):
+        if self.on_busy:
+            self.on_busy(self.active)
+
+    def cancel_all(self):
+        """Cancel the reads and reports; writes are never cancelled."""
+        for job in self.active:
+            if not job.writer:
+                job.cancel()
+
+    def shutdown(self):
+        """Cancel reads, but let queued writes finish."""
+        self.cancel_all()
+        if "io" in self.pools:
+            self.pools["io"].shutdown(wait=False, cancel_futures=True)
+        if "writer" in self.pools:
+            self.pools["writer"].shutdown(wait=True)
 
 
 # -----------------------------
 # Main App
 # -----------------------------
 class StudentManagerApp:
-    def __init__(self, root):
+    def __init__(self, root, file_path=None):
         self.root = root
         self.root.title("Student Manager")
         self.root.geometry("1000x600")
-        self.students = []
+        self.students = StudentTable()
+        self.journal = None
+        self.load_job = None
+        self.decode_job = None   # copying a mapped .smb file into memory
+        self.when_decoded = []   # edits waiting for that copy
+        self.partial = False  # not the whole file (loading cancelled or failed): view only
+        self.worker = BackgroundWorker(root, on_busy=self.show_busy)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
 
-        self.file_path = r"Assessment 1 - Skills Portfolio\Exercise 3\studentMarks.txt"
+        self.file_path = file_path or r"Assessment 1 - Skills Portfolio\Exercise 3\studentMarks.txt"
 
         self.build_ui()
-        self.load_data()
+        # Show the window first, then start reading the marks file.
+        Startup.after_first_frame(self.root, ("load marks", self.load_data))
 
     # -----------------------------
     # UI Layout
@@ -80,19 +324,41 @@ class StudentManagerApp:
             ("Update Student", self.update_student),
         ]
 
+        self.menu_buttons = []
+        self.edit_buttons = []  # need the whole file loaded
         for text, command in menu_buttons:
             btn = tk.Button(sidebar, text=text, command=command,
                             bg="#3A3A3A", fg="white", width=18, height=2,
                             font=("Arial", 10, "bold"))
             btn.pack(pady=5)
+            self.menu_buttons.append(btn)
+            if command in (self.add_student, self.delete_student, self.update_student):
+                self.edit_buttons.append(btn)
 
         # RIGHT OUTPUT PANEL
         output_frame = tk.Frame(self.root, bg="#2A2A2A")
         output_frame.pack(side="right", fill="both", expand=True)
 
-        self.output_text = tk.Text(output_frame, font=("Courier", 12),
+        status_bar = tk.Frame(output_frame, bg="#2A2A2A")
+        status_bar.pack(side="bottom", fill="x", padx=10, pady=(0, 5))
+
+        self.status_label = tk.Label(status_bar, text="", anchor="w",
+                                     font=("Arial", 10), bg="#2A2A2A", fg="#BBBBBB")
+        self.status_label.pack(side="left", fill="x", expand=True)
+
+        # Busy indicator, only shown while background jobs are running.
+        self.cancel_btn = tk.Button(status_bar, text="Cancel", command=self.worker.cancel_all,
+                                    bg="#3A3A3A", fg="white", font=("Arial", 9))
+        self.busy_label = tk.Label(status_bar, text="", font=("Arial", 10),
+                                   bg="#2A2A2A", fg="#BBBBBB")
+        self.busy_bar = ttk.Progressbar(status_bar, length=160, mode="indeterminate")
+
+        self.output_text = tk.Text(output_frame, font=("Courier", 12), height=10,
                                    bg="#2A2A2A", fg="white")
-        self.output_text.pack(fill="both", expand=True, padx=10, pady=10)
+        self.output_text.pack(side="bottom", fill="x", padx=10, pady=(0, 10))
+
+        self.record_view = RecordView(output_frame)
+        self.record_view.pack(fill="both", expand=True, padx=10, pady=10)
 
     # -----------------------------
     # Utility
@@ -101,64 +367,281 @@ class StudentManagerApp:
         self.output_text.insert(tk.END, msg + "\n")
         self.output_text.see(tk.END)
 
+    def refresh_records(self):
+        """Re-show the record table after an edit, keeping its sort column."""
+        view = self.record_view
+        if view.table is None:
+            return
+        if view.sort_column:
+            view.table = self.students
+            view.order = sorted_rows(self.students, view.sort_column, view.sort_reverse)
+            view.scroll_to(view.top)
+        else:
+            view.show(self.students)
+
+    def show_busy(self, jobs):
+        if not jobs:
+            self.busy_bar.stop()
+            for widget in (self.busy_bar, self.busy_label, self.cancel_btn):
+                widget.pack_forget()
+            return
+
+        job = jobs[0]
+        self.busy_label.config(text=job.label + ("" if len(jobs) == 1 else f" (+{len(jobs) - 1})"))
+        if job.fraction is None:
+            if str(self.busy_bar["mode"]) != "indeterminate":
+                self.busy_bar.config(mode="indeterminate")
+                self.busy_bar.start(15)
+        else:
+            self.busy_bar.stop()
+            self.busy_bar.config(mode="determinate", maximum=1.0, value=job.fraction)
+        if not self.busy_bar.winfo_ismapped():
+            self.cancel_btn.pack(side="right", padx=(5, 0))
+            self.busy_bar.pack(side="right")
+            self.busy_label.pack(side="right", padx=5)
+            if job.fraction is None:
+                self.busy_bar.start(15)
+
+    def set_menu_state(self, state):
+        for btn in self.menu_buttons:
+            btn.config(state=state)
+
     # -----------------------------
     # Load & Save Data
     # -----------------------------
     def load_data(self):
+        if self.load_job:
+            self.load_job.cancel()
+        if isinstance(self.students, MappedStudentTable):
+            self.students.close()
+        self.students = StudentTable()
+        self.partial = False
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+        self.set_menu_state("normal")
+
         if not os.path.exists(self.file_path):
             messagebox.showerror("Error", f"Cannot find file:\n{self.file_path}")
+            self.start_empty()
             return
 
-        self.students.clear()
+        if self.file_path.endswith(".smb"):
+            self.open_binary()
+            return
 
-        with open(self.file_path, "r") as file:
-            count = int(file.readline().strip())
-            for _ in range(count):
-                parts = file.readline().strip().split(",")
-                if len(parts) == 6:
-                    self.students.append(Student(*parts))
+        # Parse on a worker thread; each parsed chunk is added to the table
+        # from the Tk thread, so rows fill in as they arrive.
+        self.load = MarksLoad(self.file_path)
+        workers = (os.cpu_count() or 1) if self.load.total_bytes > PARALLEL_BYTES else 1
+        self.set_menu_state("disabled")
+        self.load_job = self.worker.submit(
+            self.read_chunks, self.load, workers, label="Loading",
+            on_progress=self.add_chunk, on_done=self.finish_load,
+            on_error=self.load_failed, on_cancel=self.load_cancelled)
+
+    def read_chunks(self, job, load, workers):
+        """Runs on a worker thread."""
+        for records in stream_marks(load.path, load, UI_CHUNK_BYTES, workers):
+            if job.cancelled:
+                return
+            job.progress(records, load.progress)
+
+    def add_chunk(self, records):
+        self.students.extend(records)
+        self.status_label.config(
+            text=f"Loading... {self.load.progress:.0%} ({len(self.students)} records)")
+
+    def load_failed(self, error):
+        self.load_job = None
+        self.view_only()
+        self.status_label.config(text=f"{len(self.students)} records (loading failed)")
+        messagebox.showerror("Error", f"Could not load {self.file_path}:\n{error}")
+
+    def load_cancelled(self, job):
+        if job is not self.load_job:
+            return  # an older load, replaced by a newer one
+        self.load_job = None
+        self.view_only()
+        self.status_label.config(text=f"{len(self.students)} records (loading cancelled)")
+        self.output_message(f"Loading cancelled: showing the first {len(self.students)} records. "
+                            "Editing is off until the whole file is loaded.\n")
+
+    def finish_load(self, _):
+        self.load_job = None
+        self.journal = StudentJournal(self.file_path, run_write=self.run_write)
+        replayed = self.journal.open(self.students, self.load.crc)
+        self.set_menu_state("normal")
+        self.status_label.config(text=f"{len(self.students)} records")
 
         self.output_message(f"Loaded {len(self.students)} student records.\n")
+        if replayed:
+            self.output_message(f"Replayed {replayed} unsaved edits from the journal.\n")
+        if not self.load.count_matches:
+            self.output_message(f"⚠ Header says {self.load.header_count} students, "
+                                f"file has {self.load.rows + len(self.load.bad)} rows.\n")
+        if self.load.bad:
+            self.output_message(f"⚠ {len(self.load.bad)} rows could not be read:")
+            for number, text, reason in self.load.bad[:20]:
+                self.output_message(f"  line {number}: {text!r} ({reason})")
+            self.output_message("")
+        if self.journal.skipped:
+            messagebox.showwarning(
+                "Journal", f"{self.journal.skipped} journal edits did not match "
+                           f"{os.path.basename(self.file_path)} and were discarded.")
+
+    def view_only(self):
+        """Show what was read but turn editing off: there is no journal to save to."""
+        self.partial = True
+        self.set_menu_state("normal")
+        for btn in self.edit_buttons:
+            btn.config(state="disabled")
+
+    def start_empty(self):
+        """Create the missing marks file with no students, so students can be added."""
+        formatter = format_binary if self.file_path.endswith(".smb") else format_marks
+        data = formatter(self.students)
+        try:
+            write_marks(self.file_path, data)
+        except OSError as error:
+            self.view_only()
+            messagebox.showerror("Error", f"Could not create {self.file_path}:\n{error}")
+            return
+        self.journal = StudentJournal(self.file_path, formatter=formatter, run_write=self.run_write)
+        self.journal.open(self.students, zlib.crc32(data))
+        self.refresh_records()
+        self.status_label.config(text="0 records")
+        self.output_message(f"Started a new, empty {os.path.basename(self.file_path)}.\n")
+
+    def run_write(self, fn, *args):
+        """Queue a journal snapshot write on the worker's writer thread."""
+        self.worker.submit(lambda job: fn(*args), label="Saving", writer=True)
+
+    def open_binary(self):
+        """Map a .smb file; rows are only decoded when they are displayed."""
+        self.students = MappedStudentTable(self.file_path)
+        self.status_label.config(text=f"{len(self.students)} records")
+        self.output_message(f"Opened {len(self.students)} student records.\n")
+        if os.path.exists(self.file_path + ".journal"):
+            self.with_editable(None)  # replay the unsaved edits
+
+    def with_editable(self, then):
+        """Call then() once the student table is editable.
+
+        Searching and editing need the in-memory indexes, so a mapped .smb
+        file is copied into memory the first time one of them is used. The
+        copy is made on a worker thread and then() runs when it is done;
+        for a table already in memory it runs straight away.
+        """
+        if not isinstance(self.students, MappedStudentTable):
+            if then:
+                then()
+            return
+        if then:
+            self.when_decoded.append(then)
+        if self.decode_job is None:
+            self.decode_job = self.worker.submit(
+                self.decode_binary, self.students, label="Preparing records",
+                on_done=self.finish_decode, on_error=self.decode_failed)
+
+    def decode_binary(self, job, mapped):
+        """Runs on a worker thread."""
+        return mapped.crc(), mapped.to_table()
+
+    def finish_decode(self, result):
+        self.decode_job = None
+        crc, table = result
+        mapped, self.students = self.students, table
+        self.journal = StudentJournal(self.file_path, formatter=format_binary,
+                                      run_write=self.run_write)
+        replayed = self.journal.open(self.students, crc)
+        if replayed:
+            self.output_message(f"Replayed {replayed} unsaved edits from the journal.\n")
+        self.refresh_records()
+        self.status_label.config(text=f"{len(self.students)} records")
+        mapped.close()  # nothing shows its rows any more
+        waiting, self.when_decoded = self.when_decoded, []
+        for then in waiting:
+            then()
+
+    def decode_failed(self, error):
+        self.decode_job = None
+        self.when_decoded = []
+        messagebox.showerror("Error", f"Could not read {self.file_path}:\n{error}")
 
     def save_data(self):
-        with open(self.file_path, "w") as f:
-            f.write(str(len(self.students)) + "\n")
-            for s in self.students:
-                f.write(f"{s.code},{s.name},{s.c1},{s.c2},{s.c3},{s.exam}\n")
+        """Write the full file now instead of waiting for the journal to compact."""
+        self.journal.compact()
+        self.refresh_records()  # compacting renumbers the rows
+
+    def close(self):
+        if self.load_job:
+            self.load_job.cancel()
+        self.worker.shutdown()
+        if self.journal:
+            self.journal.close()
+        # A copy still in progress is reading the mapping; it goes with the process.
+        if isinstance(self.students, MappedStudentTable) and self.decode_job is None:
+            self.students.close()
+        self.root.destroy()
 
     # -----------------------------
     # MENU FUNCTIONS
     # -----------------------------
     def view_all_records(self):
+        self.record_view.show(self.students)
+
         self.output_text.delete("1.0", tk.END)
         self.output_message("=== ALL STUDENT RECORDS ===\n")
+        self.output_message(f"Students: {len(self.students)}")
+        if not len(self.students):
+            return
 
-        for s in self.students:
-            self.output_message(str(s))
-
-        avg = sum(s.overall_percentage() for s in self.students) / len(self.students)
-        self.output_message(f"\nClass Average: {round(avg, 2)}%")
+        self.output_message(f"Class Average: {round(self.students.average(), 2)}%")
+        stats = getattr(self.students, "stats", None)
+        if stats:
+            self.output_message(f"Median: {stats.median()}%")
+            best = ", ".join(self.students.student(r).name for r in stats.top(3))
+            self.output_message(f"Top 3: {best}")
+        grades = self.students.grade_distribution()
+        self.output_message("Grades: " + "  ".join(f"{g}: {n}" for g, n in grades.items()))
 
     def view_individual_record(self):
         search = simpledialog.askstring("Search", "Enter student NAME or CODE:")
         if not search: return
+        self.with_editable(lambda: self.show_search(search))
+
+    def show_search(self, search):
+        s = self.students.find(search)
+        if s:
+            self.output_text.delete("1.0", tk.END)
+            self.output_message(str(s))
+            return
 
-        for s in self.students:
-            if s.code == search or s.name.lower() == search.lower():
-                self.output_text.delete("1.0", tk.END)
+        matches = self.students.starts_with(search, limit=50)
+        if matches:
+            self.output_text.delete("1.0", tk.END)
+            self.output_message(f"=== NAMES STARTING WITH '{search}' ===\n")
+            for s in matches:
                 self.output_message(str(s))
-                return
+            return
 
         messagebox.showerror("Not Found", "Student not found.")
 
     def highest_score(self):
-        top = max(self.students, key=lambda s: s.overall_percentage())
+        top = self.students.highest()
+        if top is None:
+            messagebox.showinfo("No Records", "There are no student records.")
+            return
         self.output_text.delete("1.0", tk.END)
         self.output_message("=== HIGHEST SCORE ===\n")
         self.output_message(str(top))
 
     def lowest_score(self):
-        low = min(self.students, key=lambda s: s.overall_percentage())
+        low = self.students.lowest()
+        if low is None:
+            messagebox.showinfo("No Records", "There are no student records.")
+            return
         self.output_text.delete("1.0", tk.END)
         self.output_message("=== LOWEST SCORE ===\n")
         self.output_message(str(low))
@@ -167,60 +650,88 @@ class StudentManagerApp:
         choice = messagebox.askquestion("Sort", "Sort ascending?\nClick 'No' for descending.")
         ascending = (choice == "yes")
 
-        self.students.sort(key=lambda s: s.overall_percentage(), reverse=not ascending)
-        self.save_data()
-
-        self.output_text.delete("1.0", tk.END)
-        self.output_message("✔ Records sorted and saved.\n")
+        # The table keeps this ordering up to date, so showing it is just a
+        # walk over the visible rows; the file is only reordered on request.
         self.view_all_records()
+        order = sorted_rows(self.students, "pct", not ascending)
+        self.record_view.show(self.students, order, "pct", not ascending)
+
+        if not self.partial and messagebox.askyesno("Sort", "Also save the file in this order?", default="no"):
+            self.with_editable(lambda: self.save_sorted(not ascending))
+
+    def save_sorted(self, reverse):
+        self.students.sort(reverse=reverse)
+        self.journal.sort(reverse)
+        self.record_view.show(self.students)
+        self.output_message("\n✔ Records sorted and saved.")
 
     def add_student(self):
         code = simpledialog.askstring("Add", "Enter student code:")
+        if code is None: return
         name = simpledialog.askstring("Add", "Enter student name:")
+        if name is None: return
+        try:
+            code, name = check_text("Code", code), check_text("Name", name)
+        except ValueError as e:
+            messagebox.showerror("Invalid", f"Student not added: {e}")
+            return
         c1 = simpledialog.askinteger("Add", "Coursework 1:")
         c2 = simpledialog.askinteger("Add", "Coursework 2:")
         c3 = simpledialog.askinteger("Add", "Coursework 3:")
         exam = simpledialog.askinteger("Add", "Exam mark:")
+        self.with_editable(lambda: self.add_record(code, name, c1, c2, c3, exam))
 
-        self.students.append(Student(code, name, c1, c2, c3, exam))
-        self.save_data()
+    def add_record(self, code, name, c1, c2, c3, exam):
+        try:
+            self.students.add(code, name, c1, c2, c3, exam)
+        except (TypeError, ValueError) as e:
+            messagebox.showerror("Invalid", f"Student not added: {e}")
+            return
+        self.journal.add(code, name, c1, c2, c3, exam)
+        self.refresh_records()
         self.output_message("✔ Student added successfully.\n")
 
     def delete_student(self):
         search = simpledialog.askstring("Delete", "Enter NAME or CODE to delete:")
         if not search: return
-
-        for s in self.students:
-            if s.code == search or s.name.lower() == search.lower():
-                self.students.remove(s)
-                self.save_data()
-                self.output_message("✔ Student deleted.\n")
-                return
+        self.with_editable(lambda: self.delete_record(search))
+
+    def delete_record(self, search):
+        s = self.students.find(search)
+        if s:
+            row, code = s.row, s.code
+            self.students.delete(row)
+            self.journal.delete(row, code)
+            self.refresh_records()
+            self.output_message("✔ Student deleted.\n")
+            return
 
         messagebox.showerror("Not Found", "Student does not exist.")
 
     def update_student(self):
         search = simpledialog.askstring("Update", "Enter NAME or CODE to update:")
         if not search: return
-
-        for s in self.students:
-            if s.code == search or s.name.lower() == search.lower():
-
-                new_name = simpledialog.askstring("Update", "New name:", initialvalue=s.name)
-                new_c1 = simpledialog.askinteger("Update", "Coursework 1:", initialvalue=s.c1)
-                new_c2 = simpledialog.askinteger("Update", "Coursework 2:", initialvalue=s.c2)
-                new_c3 = simpledialog.askinteger("Update", "Coursework 3:", initialvalue=s.c3)
-                new_exam = simpledialog.askinteger("Update", "Exam:", initialvalue=s.exam)
-
-                s.name = new_name
-                s.c1 = new_c1
-                s.c2 = new_c2
-                s.c3 = new_c3
-                s.exam = new_exam
-
-                self.save_data()
-                self.output_message("✔ Student updated.\n")
+        self.with_editable(lambda: self.update_record(search))
+
+    def update_record(self, search):
+        s = self.students.find(search)
+        if s:
+            new_name = simpledialog.askstring("Update", "New name:", initialvalue=s.name)
+            new_c1 = simpledialog.askinteger("Update", "Coursework 1:", initialvalue=s.c1)
+            new_c2 = simpledialog.askinteger("Update", "Coursework 2:", initialvalue=s.c2)
+            new_c3 = simpledialog.askinteger("Update", "Coursework 3:", initialvalue=s.c3)
+            new_exam = simpledialog.askinteger("Update", "Exam:", initialvalue=s.exam)
+
+            try:
+                self.students.update(s.row, name=new_name, c1=new_c1, c2=new_c2,
+                                     c3=new_c3, exam=new_exam)
+            except ValueError as e:
+                messagebox.showerror("Invalid", f"Student not updated: {e}")
                 return
+            self.journal.update(s.row)
+            self.refresh_records()
+            self.output_message("✔ Student updated.\n")
+            return
 
         messagebox.showerror("Not Found", "Student does not exist.")
 
@@ -228,6 +739,13 @@ class StudentManagerApp:
 # -----------------------------
 # Run App
 # -----------------------------
-root = tk.Tk()
-app = StudentManagerApp(root)
-root.mainloop()
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if arg != "--profile-startup"]
+    root = tk.Tk()
+    if "--profile-trace" in args:
+        i = args.index("--profile-trace")
+        import TkProfiler
+        TkProfiler.install(root, args[i + 1])
+        del args[i:i + 2]
+    app = StudentManagerApp(root, args[0] if args else None)
+    root.mainloop()
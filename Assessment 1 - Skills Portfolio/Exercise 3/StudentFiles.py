@@ -0,0 +1,604 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from collections import deque
+from contextlib import contextmanager
+
+from StudentStore import Student, StudentTable, check_marks
+
+CHUNK_BYTES = 1 << 20
+
+
+# -----------------------------
+# studentMarks.txt Snapshot
+# -----------------------------
+class MarksLoad:
+    """Progress and problems found while streaming a marks file.
+
+    bad holds (line number, text, reason) for every row that was rejected,
+    so nothing is dropped without a trace.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.total_bytes = os.path.getsize(path)
+        self.bytes_read = 0
+        self.header_count = None
+        self.rows = 0
+        self.bad = []
+        self.crc = 0
+
+    @property
+    def progress(self):
+        return self.bytes_read / self.total_bytes if self.total_bytes else 1.0
+
+    @property
+    def count_matches(self):
+        return self.header_count == self.rows + len(self.bad)
+
+
+def parse_chunk(first_line, lines):
+    """Parse raw marks lines into (records, bad rows). Runs in worker processes."""
+    records, bad = [], []
+    for number, raw in enumerate(lines, first_line):
+        text = raw.decode("utf-8", "replace").strip()
+        if not text:
+            continue
+        parts = text.split(",")
+        if len(parts) != 6:
+            bad.append((number, text, f"expected 6 fields, found {len(parts)}"))
+            continue
+        try:
+            marks = check_marks(*parts[2:])
+        except ValueError as e:
+            bad.append((number, text, str(e)))
+            continue
+        records.append((parts[0].strip(), parts[1].strip()) + marks)
+    return records, bad
+
+
+def _read_chunks(f, load, chunk_bytes):
+    """Yield (first line number, raw lines, byte count) from an open file."""
+    line_number = 2
+    while True:
+        lines = f.readlines(chunk_bytes)
+        if not lines:
+            return
+        size = sum(map(len, lines))
+        for line in lines:
+            load.crc = zlib.crc32(line, load.crc)
+        yield line_number, lines, size
+        line_number += len(lines)
+
+
+def stream_marks(path, load=None, chunk_bytes=CHUNK_BYTES, workers=1):
+    """Yield lists of parsed (code, name, c1, c2, c3, exam) records chunk by chunk.
+
+    Chunks come back in file order. With workers > 1 parsing is spread over
+    a process pool, keeping only a couple of chunks per worker in flight.
+    Progress, the header check and bad rows are recorded on load.
+    """
+    if load is None:
+        load = MarksLoad(path)
+
+    with open(path, "rb") as f:
+        header = f.readline()
+        load.crc = zlib.crc32(header)
+        load.bytes_read = len(header)
+        try:
+            load.header_count = int(header.strip())
+        except ValueError:
+            load.bad.append((1, header.decode("utf-8", "replace").strip(),
+                             "first line should be the number of students"))
+
+        chunks = _read_chunks(f, load, chunk_bytes)
+        if workers > 1:
+            parsed = _parse_parallel(chunks, workers)
+        else:
+            parsed = ((parse_chunk(first, lines), size) for first, lines, size in chunks)
+
+        for (records, bad), size in parsed:
+            load.bytes_read += size
+            load.rows += len(records)
+            load.bad.extend(bad)
+            yield records
+
+
+def _parse_parallel(chunks, workers):
+    from concurrent.futures import ProcessPoolExecutor  # only big files need it; keeps startup light
+
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        for first, lines, size in chunks:
+            pending.append((pool.submit(parse_chunk, first, lines), size))
+            if len(pending) >= workers * 2:
+                future, size = pending.popleft()
+                yield future.result(), size
+        while pending:
+            future, size = pending.popleft()
+            yield future.result(), size
+
+
+def read_marks(path, table, workers=1):
+    """Load a whole marks file into table. Returns the MarksLoad."""
+    load = MarksLoad(path)
+    for records in stream_marks(path, load, workers=workers):
+        table.extend(records)
+    return load
+
+
+def format_marks(table):
+    """The count-header text for every live row of table, as bytes."""
+    out = [f"{len(table)}\n"]
+    codes, names = table.codes, table.names
+    c1, c2, c3, exam = table.c1, table.c2, table.c3, table.exam
+    for r in table.rows():
+        out.append(f"{codes[r]},{names[r]},{c1[r]},{c2[r]},{c3[r]},{exam[r]}\n")
+    return "".join(out).encode("utf-8")
+
+
+def write_marks(path, data):
+    """Replace path with data atomically (temp file, fsync, rename)."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+# -----------------------------
+# Binary Marks File (.smb)
+# -----------------------------
+# Little-endian header, then the columns back to back:
+#   pct       count x float64   overall percentage
+#   c1..exam  count x uint8     one column per mark
+#   grades    count x uint8     grade letter as ASCII
+#   offsets   (2 x count + 1) x uint32, where every code and then every
+#             name starts in the strings blob, plus its end
+#   strings   UTF-8 blob holding every code followed by every name
+# The header carries the row count and the aggregates the app shows first.
+BINARY_MAGIC = b"SMRK"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct("<4sHHIIdddII5I")
+GRADE_LETTERS = "ABCDF"
+
+
+def _binary_layout(count, string_bytes):
+    """Byte offset of each column for a file with count rows."""
+    layout = {}
+    offset = (BINARY_HEADER.size + 7) // 8 * 8
+    layout["pct"] = offset
+    offset += count * 8
+    for column in ("c1", "c2", "c3", "exam", "grades"):
+        layout[column] = offset
+        offset += count
+    offset = (offset + 3) // 4 * 4
+    layout["offsets"] = offset
+    offset += (2 * count + 1) * 4
+    layout["strings"] = offset
+    layout["end"] = offset + string_bytes
+    return layout
+
+
+def format_binary(table):
+    """Encode every live row of table in the .smb layout, as bytes."""
+    rows = list(table.rows())
+    count = len(rows)
+
+    strings = bytearray()
+    offsets = array("I")
+    for column in (table.codes, table.names):
+        for r in rows:
+            offsets.append(len(strings))
+            strings += column[r].encode("utf-8")
+    offsets.append(len(strings))
+
+    pct = array("d", (table.pct[r] for r in rows))
+    grade_counts = [0] * len(GRADE_LETTERS)
+    for r in rows:
+        grade_counts[GRADE_LETTERS.index(chr(table.grades[r]))] += 1
+    if count:
+        max_i = max(range(count), key=pct.__getitem__)
+        min_i = min(range(count), key=pct.__getitem__)
+        aggregates = (sum(pct), pct[min_i], pct[max_i], min_i, max_i)
+    else:
+        aggregates = (0.0, 0.0, 0.0, 0, 0)
+
+    layout = _binary_layout(count, len(strings))
+    out = bytearray(layout["end"])
+    BINARY_HEADER.pack_into(out, 0, BINARY_MAGIC, BINARY_VERSION, 0, count,
+                            len(strings), *aggregates, *grade_counts)
+    out[layout["pct"]:layout["pct"] + count * 8] = pct.tobytes()
+    for column in ("c1", "c2", "c3", "exam", "grades"):
+        values = getattr(table, column)
+        out[layout[column]:layout[column] + count] = bytes(values[r] for r in rows)
+    out[layout["offsets"]:layout["strings"]] = offsets.tobytes()
+    out[layout["strings"]:] = strings
+    return bytes(out)
+
+
+class _StringColumn:
+    """Sequence of strings decoded on access from the .smb string blob."""
+
+    def __init__(self, strings, offsets):
+        self.strings = strings
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return str(self.strings[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+
+class MappedStudentTable:
+    """Read-only, memory-mapped view of a .smb file.
+
+    Exposes the same columns as StudentTable, so Student views work on it
+    unchanged, but nothing is decoded until a row is actually read. The
+    summary figures come straight from the header. Use to_table() for
+    searching or editing.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mm)
+
+        (magic, version, _, self.size, string_bytes, self.pct_sum, self.pct_min,
+         self.pct_max, self.min_row, self.max_row, *grade_counts) = BINARY_HEADER.unpack_from(view)
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            view.release()
+            self._mm.close()
+            raise ValueError(f"{path} is not a version {BINARY_VERSION} student marks file.")
+        self.grade_counts = dict(zip(GRADE_LETTERS, grade_counts))
+
+        n = self.size
+        layout = _binary_layout(n, string_bytes)
+        self._views = [view]
+        self.pct = self._column(layout["pct"], n * 8, "d")
+        for column in ("c1", "c2", "c3", "exam", "grades"):
+            setattr(self, column, self._column(layout[column], n, "B"))
+        offsets = self._column(layout["offsets"], (2 * n + 1) * 4, "I")
+        strings = self._column(layout["strings"], string_bytes, "B")
+        # Names start where the codes end, so the two runs share one entry.
+        self.codes = _StringColumn(strings, self._track(offsets[:n + 1]))
+        self.names = _StringColumn(strings, self._track(offsets[n:]))
+
+    def _column(self, start, length, fmt):
+        raw = self._track(self._views[0][start:start + length])
+        return self._track(raw.cast(fmt))
+
+    def _track(self, view):
+        """Remember a view so close() can release it before unmapping."""
+        self._views.append(view)
+        return view
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for row in self.rows():
+            yield Student(self, row)
+
+    def rows(self):
+        return range(self.size)
+
+    def student(self, row):
+        return Student(self, row)
+
+    def average(self):
+        return self.pct_sum / self.size if self.size else None
+
+    def highest(self):
+        return Student(self, self.max_row) if self.size else None
+
+    def lowest(self):
+        return Student(self, self.min_row) if self.size else None
+
+    def grade_distribution(self):
+        return dict(self.grade_counts)
+
+    def crc(self):
+        return zlib.crc32(self._mm)
+
+    def records(self):
+        for r in self.rows():
+            yield (self.codes[r], self.names[r],
+                   self.c1[r], self.c2[r], self.c3[r], self.exam[r])
+
+    def to_table(self):
+        table = StudentTable()
+        table.extend(self.records())
+        return table
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mm.close()
+
+
+def text_to_binary(src, dst):
+    """Convert a count-header studentMarks.txt file to .smb. Returns the MarksLoad."""
+    table = StudentTable()
+    load = read_marks(src, table)
+    write_marks(dst, format_binary(table))
+    return load
+
+
+def binary_to_text(src, dst):
+    """Convert a .smb file back to the count-header text layout."""
+    mapped = MappedStudentTable(src)
+    try:
+        data = format_marks(mapped)
+    finally:
+        mapped.close()
+    write_marks(dst, data)
+
+
+# -----------------------------
+# Write-Ahead Journal
+# -----------------------------
+class StudentJournal:
+    """Append-only log of edits made on top of a studentMarks.txt snapshot.
+
+    Each edit is one checksummed line holding a JSON array, fsynced before
+    the call returns (or once at the end of a batch()). The first line of
+    a journal holds the CRC-32 of the snapshot it applies to, so a journal
+    left over from an interrupted compaction is never applied twice.
+
+    Records:
+        ["B", snapshot crc or "--------"]          journal header
+        ["A", code, name, c1, c2, c3, exam]        add
+        ["U", row, code, name, c1, c2, c3, exam]   update
+        ["D", row, code]                           delete
+        ["S", 1 for descending, else 0]            physical sort
+
+    Once the journal grows past compact_bytes it is rotated to
+    <snapshot>.journal.old and a copy of the table's columns is handed to
+    run_write (by default a new thread), which formats and writes the new
+    snapshot. The fresh journal starts with a placeholder header that the
+    writer fills in before replacing the snapshot, so nothing about the
+    table is formatted on the caller's thread. The .old file is removed
+    once the new snapshot is in place. Pass formatter=format_binary to keep
+    a .smb snapshot instead.
+    """
+    PENDING_BASE = "--------"
+
+    def __init__(self, snapshot_path, compact_bytes=1 << 20, formatter=format_marks,
+                 run_write=None):
+        self.snapshot_path = snapshot_path
+        self.formatter = formatter
+        self.path = snapshot_path + ".journal"
+        self.old_path = self.path + ".old"
+        self.compact_bytes = compact_bytes
+        self.table = None
+        self.skipped = 0
+        self._file = None
+        self._size = 0
+        self._batch = 0
+        self._idle = threading.Event()
+        self._idle.set()
+        self.run_write = run_write or _run_in_thread
+
+    # -----------------------------
+    # Open & Replay
+    # -----------------------------
+    def open(self, table, snapshot_crc):
+        """Replay pending journals onto table, then open for appending.
+
+        Returns the number of records replayed. Records that no longer fit
+        the snapshot (e.g. it was edited by hand) are counted in skipped.
+        """
+        self.table = table
+        self.skipped = 0
+        replayed = 0
+
+        old_base, old_records = self._read(self.old_path)
+        used_old = old_base == snapshot_crc
+        if used_old:
+            replayed += self._replay(old_records)
+
+        base, records = self._read(self.path)
+        stopped = False
+        if base == snapshot_crc or used_old:
+            replayed += self._replay(records)
+            stopped = self.skipped > 0
+        else:
+            self.skipped += len(records)
+
+        if used_old or stopped or os.path.exists(self.old_path):
+            # Recovering from an interrupted compaction, or from a record
+            # that could not be replayed: fold everything into the snapshot
+            # now and start over with an empty journal, so later edits are
+            # not stuck behind the bad record.
+            table.compact()  # row numbers in new records must match the file
+            data = self.formatter(table)
+            write_marks(self.snapshot_path, data)
+            self._start(zlib.crc32(data))
+            if os.path.exists(self.old_path):
+                os.remove(self.old_path)
+        elif base == snapshot_crc:
+            self._file = open(self.path, "ab")
+            self._size = self._file.tell()
+        else:
+            self._start(snapshot_crc)
+        return replayed
+
+    def _read(self, path):
+        """Header CRC and records of a journal file, dropping a torn tail."""
+        if not os.path.exists(path):
+            return None, []
+
+        base, records = None, []
+        with open(path, "rb") as f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                crc, _, payload = raw[:-1].partition(b" ")
+                if crc != b"%08x" % zlib.crc32(payload):
+                    break
+                fields = json.loads(payload)
+                if fields[0] == "B":
+                    base = None if fields[1] == self.PENDING_BASE else int(fields[1], 16)
+                else:
+                    records.append(fields)
+        return base, records
+
+    def _replay(self, records):
+        """Apply records in order, stopping at the first one that does not fit."""
+        table = self.table
+        for i, fields in enumerate(records):
+            try:
+                self._apply(table, fields)
+            except (IndexError, TypeError, ValueError):
+                self.skipped += len(records) - i
+                return i
+        return len(records)
+
+    def _apply(self, table, fields):
+        kind = fields[0]
+        if kind == "A" and len(fields) == 7:
+            table.add(*fields[1:7])
+        elif kind == "S" and len(fields) == 2:
+            table.sort(reverse=fields[1] == 1)
+        elif (kind, len(fields)) in (("U", 8), ("D", 3)):
+            row = int(fields[1])
+            if not 0 <= row < len(table.codes) or not table.alive[row] or table.codes[row] != fields[2]:
+                raise ValueError(f"row {row} is not {fields[2]}")
+            if kind == "U":
+                table.update(row, *fields[3:8])
+            else:
+                table.delete(row)
+        else:
+            raise ValueError(f"bad journal record {fields!r}")
+
+    # -----------------------------
+    # Appending
+    # -----------------------------
+    def add(self, code, name, c1, c2, c3, exam):
+        self._append(["A", code, name, c1, c2, c3, exam])
+
+    def update(self, row):
+        t = self.table
+        self._append(["U", row, t.codes[row], t.names[row], t.c1[row], t.c2[row], t.c3[row], t.exam[row]])
+
+    def delete(self, row, code):
+        self._append(["D", row, code])
+
+    def sort(self, reverse):
+        self._append(["S", int(reverse)])
+
+    @contextmanager
+    def batch(self):
+        """Group several edits under a single fsync."""
+        self._batch += 1
+        try:
+            yield self
+        finally:
+            self._batch -= 1
+            if not self._batch:
+                self._sync()
+                self.maybe_compact()
+
+    def _start(self, snapshot_crc):
+        self._file = open(self.path, "wb")
+        self._size = 0
+        self._batch, batch = 0, self._batch
+        self._append(self._header(snapshot_crc))
+        self._batch = batch
+
+    def _header(self, snapshot_crc):
+        return ["B", self.PENDING_BASE if snapshot_crc is None else f"{snapshot_crc:08x}"]
+
+    def _line(self, fields):
+        # JSON keeps commas and newlines in names from breaking the record.
+        payload = json.dumps(fields, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return b"%08x %s\n" % (zlib.crc32(payload), payload)
+
+    def _append(self, fields):
+        line = self._line(fields)
+        self._file.write(line)
+        self._size += len(line)
+        if not self._batch:
+            self._sync()
+            self.maybe_compact()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    # -----------------------------
+    # Compaction
+    # -----------------------------
+    def maybe_compact(self):
+        if self._size >= self.compact_bytes:
+            self.compact()
+
+    def compact(self, wait=False):
+        """Rewrite the snapshot from the table and start a fresh journal.
+
+        The table's dead rows are dropped first, so the row numbers later
+        records use match the snapshot being written; callers holding row
+        numbers must look them up again. Does nothing while an earlier
+        compaction is still being written.
+        """
+        if self._idle.is_set():
+            self.table.compact()
+            snapshot = self.table.snapshot()
+            self._file.close()
+            os.replace(self.path, self.old_path)
+            self._start(None)
+            self._idle.clear()
+            self.run_write(self._write_snapshot, snapshot)
+        if wait:
+            self._idle.wait()
+
+    def _write_snapshot(self, snapshot):
+        try:
+            data = self.formatter(snapshot)
+            with open(self.path, "r+b") as f:
+                f.write(self._line(self._header(zlib.crc32(data))))
+                f.flush()
+                os.fsync(f.fileno())
+            write_marks(self.snapshot_path, data)
+            os.remove(self.old_path)
+        finally:
+            self._idle.set()
+
+    @property
+    def writing(self):
+        return not self._idle.is_set()
+
+    def close(self):
+        self._idle.wait()
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+def _run_in_thread(fn, *args):
+    threading.Thread(target=fn, args=args).start()
+
+
+# -----------------------------
+# Convert Between Formats
+# -----------------------------
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python StudentFiles.py SOURCE DEST  (one .txt, one .smb)")
+    src, dst = sys.argv[1:]
+    if dst.endswith(".smb"):
+        load = text_to_binary(src, dst)
+        print(f"Wrote {load.rows} records to {dst} ({len(load.bad)} bad rows skipped).")
+    else:
+        binary_to_text(src, dst)
+        print(f"Wrote {dst}.")
@@ -0,0 +1,226 @@
+"""Grade many studentMarks.txt files at once, without the GUI.
+
+    python StudentReport.py marks/ extra/studentMarks.txt --jobs 8 --format csv
+    python StudentReport.py marks/ --format json --output report.jsonl
+
+Files are processed in parallel, one per worker process, and each file is
+streamed rather than loaded whole. A report line is written as soon as a
+file is done, followed by one combined line for all files.
+"""
+import argparse
+import csv
+import heapq
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from StudentFiles import MappedStudentTable, MarksLoad, stream_marks
+from StudentStore import grade_of, percentage_of
+
+# Overall marks are whole numbers out of 160, so a 161-slot histogram is
+# enough for exact averages, medians and grade counts in constant memory.
+MAX_TOTAL = 160
+FIELDS = ["file", "students", "average", "median", "lowest", "highest",
+          "A", "B", "C", "D", "F", "bad_rows", "top", "bottom", "error"]
+
+
+# -----------------------------
+# Streaming Summary
+# -----------------------------
+class CohortSummary:
+    """Summary of a cohort built one record at a time.
+
+    Keeps a histogram of overall marks plus the k best and worst students,
+    so memory does not grow with the number of records. Summaries of
+    separate files can be merged into a combined one.
+    """
+
+    def __init__(self, top_k=3):
+        self.top_k = top_k
+        self.totals = [0] * (MAX_TOTAL + 1)
+        self.count = 0
+        self.bad_rows = 0
+        self.best = []   # min-heap of (pct, -order, code, name)
+        self.worst = []  # min-heap of (-pct, -order, code, name)
+        self.order = 0
+
+    def add(self, code, name, c1, c2, c3, exam):
+        self.totals[c1 + c2 + c3 + exam] += 1
+        self.count += 1
+        pct = percentage_of(c1, c2, c3, exam)
+        self.order += 1
+        # Earlier records win ties, as in the app's highest/lowest.
+        self._keep(self.best, (pct, -self.order, code, name))
+        self._keep(self.worst, (-pct, -self.order, code, name))
+
+    def _keep(self, heap, item):
+        if len(heap) < self.top_k:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    def merge(self, other):
+        self.totals = [a + b for a, b in zip(self.totals, other.totals)]
+        self.count += other.count
+        self.bad_rows += other.bad_rows
+        # Re-rank the other file's students after this file's ones.
+        offset = self.order
+        for pct, order, code, name in other.best:
+            self._keep(self.best, (pct, order - offset, code, name))
+        for pct, order, code, name in other.worst:
+            self._keep(self.worst, (pct, order - offset, code, name))
+        self.order += other.order
+
+    # -----------------------------
+    # Figures
+    # -----------------------------
+    def _pct(self, total):
+        return round((total / 160) * 100, 2)
+
+    def _nth_total(self, n):
+        seen = 0
+        for total, count in enumerate(self.totals):
+            seen += count
+            if seen > n:
+                return total
+
+    def average(self):
+        if not self.count:
+            return None
+        # Averages the rounded percentages, like the app's class average.
+        hundredths = sum(round(self._pct(total) * 100) * count
+                         for total, count in enumerate(self.totals))
+        return round(hundredths / 100 / self.count, 2)
+
+    def median(self):
+        if not self.count:
+            return None
+        n = self.count
+        if n % 2:
+            return self._pct(self._nth_total(n // 2))
+        return round((self._pct(self._nth_total(n // 2 - 1)) + self._pct(self._nth_total(n // 2))) / 2, 2)
+
+    def grades(self):
+        grades = dict.fromkeys("ABCDF", 0)
+        for total, count in enumerate(self.totals):
+            if count:
+                grades[grade_of(self._pct(total))] += count
+        return grades
+
+    def top(self):
+        return [(code, name, pct) for pct, _, code, name in sorted(self.best, reverse=True)]
+
+    def bottom(self):
+        return [(code, name, -pct) for pct, _, code, name in sorted(self.worst, reverse=True)]
+
+    def as_dict(self, label):
+        top, bottom = self.top(), self.bottom()
+        return {
+            "file": label,
+            "students": self.count,
+            "average": self.average(),
+            "median": self.median(),
+            "lowest": bottom[0][2] if bottom else None,
+            "highest": top[0][2] if top else None,
+            **self.grades(),
+            "bad_rows": self.bad_rows,
+            "top": [{"code": c, "name": n, "percentage": p} for c, n, p in top],
+            "bottom": [{"code": c, "name": n, "percentage": p} for c, n, p in bottom],
+            "error": None,
+        }
+
+
+def summarise_file(path, top_k):
+    """Runs in a worker process: stream one marks file into a CohortSummary."""
+    summary = CohortSummary(top_k)
+    if path.endswith(".smb"):
+        mapped = MappedStudentTable(path)
+        try:
+            for record in mapped.records():
+                summary.add(*record)
+        finally:
+            mapped.close()
+        return summary
+
+    load = MarksLoad(path)
+    for records in stream_marks(path, load):
+        for record in records:
+            summary.add(*record)
+    summary.bad_rows = len(load.bad)
+    return summary
+
+
+# -----------------------------
+# Output
+# -----------------------------
+class ReportWriter:
+    def __init__(self, out, fmt):
+        self.out = out
+        self.fmt = fmt
+        if fmt == "csv":
+            self.csv = csv.DictWriter(out, FIELDS)
+            self.csv.writeheader()
+
+    def write(self, row):
+        if self.fmt == "json":
+            self.out.write(json.dumps(row) + "\n")
+        else:
+            flat = dict(row)
+            for key in ("top", "bottom"):
+                flat[key] = "; ".join(f"{s['name']} ({s['code']}) {s['percentage']}%"
+                                      for s in row[key] or [])
+            self.csv.writerow(flat)
+        self.out.flush()
+
+
+def find_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith((".txt", ".smb")):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grade student marks files in parallel.")
+    parser.add_argument("paths", nargs="+", help="marks files or directories of them")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: one per core)")
+    parser.add_argument("--format", choices=("csv", "json"), default="csv",
+                        help="csv, or json with one object per line")
+    parser.add_argument("--output", help="write here instead of standard output")
+    parser.add_argument("--top", type=int, default=3, help="best/worst students to list")
+    args = parser.parse_args(argv)
+
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    writer = ReportWriter(out, args.format)
+    combined = CohortSummary(args.top)
+    failed = 0
+
+    try:
+        with ProcessPoolExecutor(max(1, args.jobs)) as pool:
+            futures = {pool.submit(summarise_file, path, args.top): path
+                       for path in find_files(args.paths)}
+            # Files are reported in the order they finish.
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    failed += 1
+                    writer.write(dict.fromkeys(FIELDS) | {"file": path, "error": str(e)})
+                    continue
+                writer.write(summary.as_dict(path))
+                combined.merge(summary)
+        writer.write(combined.as_dict("(combined)"))
+    finally:
+        if args.output:
+            out.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,622 @@
+import bisect
+import heapq
+from array import array
+from itertools import compress
+
+np = None  # NumPy if installed; imported by _numpy() on first use, not at startup
+_numpy_checked = False
+
+def _numpy():
+    global np, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+    return np
+
+# Typecodes for the numeric columns. Marks fit comfortably in a signed short.
+MARK_COLUMNS = ("c1", "c2", "c3", "exam")
+MARK_TYPE = "h"
+MARK_LIMITS = (20, 20, 20, 100)
+
+
+# -----------------------------
+# Marks Helpers
+# -----------------------------
+def check_marks(c1, c2, c3, exam):
+    """Marks as ints, or ValueError if any is missing or out of range."""
+    marks = (int(c1), int(c2), int(c3), int(exam))
+    if not (0 <= marks[0] <= 20 and 0 <= marks[1] <= 20
+            and 0 <= marks[2] <= 20 and 0 <= marks[3] <= 100):
+        for mark, limit in zip(marks, MARK_LIMITS):
+            if not 0 <= mark <= limit:
+                raise ValueError(f"Mark {mark} is outside 0-{limit}.")
+    return marks
+
+
+def check_text(label, text):
+    """text stripped, or ValueError if it is missing or would split a line of the marks file."""
+    text = "" if text is None else str(text).strip()
+    if not text:
+        raise ValueError(f"{label} is missing.")
+    if "," in text or "\n" in text or "\r" in text:
+        raise ValueError(f"{label} cannot contain a comma or a line break.")
+    return text
+
+
+def percentage_of(c1, c2, c3, exam):
+    return round(((c1 + c2 + c3 + exam) / 160) * 100, 2)
+
+
+def grade_of(pct):
+    if pct >= 70: return "A"
+    elif pct >= 60: return "B"
+    elif pct >= 50: return "C"
+    elif pct >= 40: return "D"
+    else: return "F"
+
+
+# -----------------------------
+# Student Class
+# -----------------------------
+class Student:
+    """Lightweight view of one row in a StudentTable.
+
+    Views are cheap to create and hold no data of their own, so they should
+    not be kept across a table compaction or sort (row numbers change).
+    """
+    __slots__ = ("table", "row")
+
+    def __init__(self, table, row):
+        self.table = table
+        self.row = row
+
+    @property
+    def code(self):
+        return self.table.codes[self.row]
+
+    @property
+    def name(self):
+        return self.table.names[self.row]
+
+    @property
+    def c1(self):
+        return self.table.c1[self.row]
+
+    @property
+    def c2(self):
+        return self.table.c2[self.row]
+
+    @property
+    def c3(self):
+        return self.table.c3[self.row]
+
+    @property
+    def exam(self):
+        return self.table.exam[self.row]
+
+    def coursework_total(self):
+        t, r = self.table, self.row
+        return t.c1[r] + t.c2[r] + t.c3[r]
+
+    def overall_percentage(self):
+        return self.table.pct[self.row]
+
+    def grade(self):
+        return chr(self.table.grades[self.row])
+
+    def __str__(self):
+        return (
+            f"Name: {self.name}\n"
+            f"Code: {self.code}\n"
+            f"Coursework Total: {self.coursework_total()}/60\n"
+            f"Exam Mark: {self.exam}/100\n"
+            f"Overall Percentage: {self.overall_percentage()}%\n"
+            f"Grade: {self.grade()}\n"
+            "-----------------------------"
+        )
+
+
+# -----------------------------
+# Columnar Student Table
+# -----------------------------
+class StudentTable:
+    """Column store for student records.
+
+    Codes and names live in plain lists, the four marks in compact arrays,
+    and the percentage and grade of every row are worked out once when the
+    row is added or updated. Deleted rows are only marked dead and squeezed
+    out by compact() once they outnumber the live ones, so row numbers stay
+    stable between compactions.
+
+    Lookups go through indexes kept up to date on every mutation: code and
+    case-folded name map to the rows holding them (in file order, since
+    names and even codes can repeat).
+
+    Sorted orderings by any of SORT_KEYS are built the first time they are
+    asked for and from then on kept in step with every mutation by bisect
+    insertion, so showing the table sorted is a walk over the first rows
+    of a list rather than a sort. The name ordering also answers "starts
+    with" searches.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.codes = []
+        self.names = []
+        self.c1 = array(MARK_TYPE)
+        self.c2 = array(MARK_TYPE)
+        self.c3 = array(MARK_TYPE)
+        self.exam = array(MARK_TYPE)
+        self.pct = array("d")
+        self.grades = bytearray()
+        self.alive = bytearray()
+        self.size = 0
+        self.by_code = {}
+        self.by_name = {}
+        self.orders = {}
+        self.orders_dirty = set()
+        self.stats = StudentStats(self)
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for row in self.rows():
+            yield Student(self, row)
+
+    def rows(self):
+        """Live row numbers in file order."""
+        if self.size == len(self.alive):
+            return range(self.size)
+        return compress(range(len(self.alive)), self.alive)
+
+    def student(self, row):
+        return Student(self, row)
+
+    def snapshot(self):
+        """Copy of the columns only, cheap enough to take on the UI thread.
+
+        The copy has no indexes or stats; it is meant for formatting or
+        reading on another thread while this table keeps changing.
+        """
+        copy = StudentTable.__new__(StudentTable)
+        copy.codes = self.codes[:]
+        copy.names = self.names[:]
+        for column in MARK_COLUMNS + ("pct", "grades", "alive"):
+            setattr(copy, column, getattr(self, column)[:])
+        copy.size = self.size
+        return copy
+
+    # -----------------------------
+    # Mutation
+    # -----------------------------
+    def add(self, code, name, c1, c2, c3, exam):
+        row = self._append(code, name, c1, c2, c3, exam)
+        self._index(row)
+        self.stats.added(row)
+        return row
+
+    def extend(self, records):
+        """Bulk add (code, name, c1, c2, c3, exam) records column by column.
+
+        The whole batch is checked before anything is added, and the indexes
+        are updated once at the end rather than per row.
+        """
+        records = list(records)
+        if not records:
+            return
+        codes, names, *marks = zip(*records)
+        marks = [array(MARK_TYPE, map(int, column)) for column in marks]
+        for column, limit in zip(marks, MARK_LIMITS):
+            if min(column) < 0 or max(column) > limit:
+                bad = next(m for m in column if not 0 <= m <= limit)
+                raise ValueError(f"Mark {bad} is outside 0-{limit}.")
+
+        # Same expression as percentage_of, inlined for speed.
+        pct = array("d", [round(((a + b + c + d) / 160) * 100, 2)
+                          for a, b, c, d in zip(*marks)])
+
+        start = len(self.alive)
+        self.codes.extend(str(code).strip() for code in codes)
+        self.names.extend(str(name).strip() for name in names)
+        for name, column in zip(MARK_COLUMNS, marks):
+            getattr(self, name).extend(column)
+        self.pct.extend(pct)
+        self.grades.extend(ord(grade_of(p)) for p in pct)
+        self.alive.extend(b"\x01" * len(records))
+        self.size += len(records)
+        self._index_from(start)
+        self.stats.added_range(start, len(self.alive))
+
+    def _index_from(self, start):
+        stop = len(self.alive)
+        for row in range(start, stop):
+            self.by_code.setdefault(self.codes[row], []).append(row)
+            self.by_name.setdefault(self.names[row].casefold(), []).append(row)
+        # Sorted lazily, so loading in many chunks does not re-sort each time.
+        for key, order in self.orders.items():
+            value = sort_key(self, key)
+            order.extend((value(row), row) for row in range(start, stop))
+            self.orders_dirty.add(key)
+
+    def _append(self, code, name, c1, c2, c3, exam):
+        code, name = check_text("Code", code), check_text("Name", name)
+        marks = check_marks(c1, c2, c3, exam)
+        pct = percentage_of(*marks)
+
+        row = len(self.alive)
+        self.codes.append(code)
+        self.names.append(name)
+        for column, mark in zip(MARK_COLUMNS, marks):
+            getattr(self, column).append(mark)
+        self.pct.append(pct)
+        self.grades.append(ord(grade_of(pct)))
+        self.alive.append(1)
+        self.size += 1
+        return row
+
+    def update(self, row, name=None, c1=None, c2=None, c3=None, exam=None):
+        current = (self.c1[row], self.c2[row], self.c3[row], self.exam[row])
+        marks = check_marks(*(old if new is None else new
+                              for old, new in zip(current, (c1, c2, c3, exam))))
+        if name is not None:
+            name = check_text("Name", name)
+        reordered = [key for key in self.orders
+                     if key != "code" and (key != "name" or name is not None)]
+        self._unorder(row, reordered)
+        if name is not None:
+            _index_remove(self.by_name, self.names[row].casefold(), row)
+            self.names[row] = name
+            bisect.insort(self.by_name.setdefault(self.names[row].casefold(), []), row)
+        for column, mark in zip(MARK_COLUMNS, marks):
+            getattr(self, column)[row] = mark
+
+        old_pct, old_grade = self.pct[row], self.grades[row]
+        pct = percentage_of(*marks)
+        self.pct[row] = pct
+        self.grades[row] = ord(grade_of(pct))
+        self._order(row, reordered)
+        self.stats.changed(row, old_pct, old_grade)
+
+    def delete(self, row):
+        if not self.alive[row]:
+            return
+        self.alive[row] = 0
+        self.size -= 1
+        _index_remove(self.by_code, self.codes[row], row)
+        _index_remove(self.by_name, self.names[row].casefold(), row)
+        self._unorder(row, list(self.orders))
+        self.stats.removed(row)
+        if len(self.alive) - self.size > max(self.size, 1024):
+            self.compact()
+
+    def compact(self):
+        """Drop dead rows. Row numbers of live rows change."""
+        if self.size != len(self.alive):
+            self._take(list(self.rows()))
+
+    def sort(self, reverse=False):
+        """Physically reorder the live rows by overall percentage."""
+        self._take(self._argsort(reverse))
+
+    def _take(self, order):
+        self.codes = [self.codes[i] for i in order]
+        self.names = [self.names[i] for i in order]
+        for column in MARK_COLUMNS + ("pct",):
+            setattr(self, column, _take_column(getattr(self, column), order))
+        self.grades = bytearray(map(self.grades.__getitem__, order))
+        self.alive = bytearray(b"\x01") * len(order)
+        self.size = len(order)
+        self._reindex()
+        self.stats.rebuild()
+
+    # -----------------------------
+    # Lookup Indexes
+    # -----------------------------
+    def _index(self, row):
+        self.by_code.setdefault(self.codes[row], []).append(row)
+        self.by_name.setdefault(self.names[row].casefold(), []).append(row)
+        self._order(row, list(self.orders))
+
+    def _reindex(self):
+        self.by_code = {}
+        self.by_name = {}
+        for row in self.rows():
+            self.by_code.setdefault(self.codes[row], []).append(row)
+            self.by_name.setdefault(self.names[row].casefold(), []).append(row)
+        for key in self.orders:
+            self.orders[key] = self._build_order(key)
+        self.orders_dirty.clear()
+
+    def find(self, search):
+        """First student in file order whose code or name matches exactly."""
+        search = search.strip()
+        rows = self.by_code.get(search, []) + self.by_name.get(search.casefold(), [])
+        return Student(self, min(rows)) if rows else None
+
+    def find_code(self, code):
+        rows = self.by_code.get(code.strip())
+        return Student(self, rows[0]) if rows else None
+
+    def find_name(self, name):
+        return [Student(self, row) for row in self.by_name.get(name.strip().casefold(), [])]
+
+    def starts_with(self, prefix, limit=None):
+        """Students whose name starts with prefix, in name order."""
+        prefix = prefix.strip().casefold()
+        name_order = self.order("name")
+        found = []
+        i = bisect.bisect_left(name_order, (prefix,))
+        while i < len(name_order) and (limit is None or len(found) < limit):
+            folded, row = name_order[i]
+            if not folded.startswith(prefix):
+                break
+            found.append(Student(self, row))
+            i += 1
+        return found
+
+    # -----------------------------
+    # Sorted Orderings
+    # -----------------------------
+    def order(self, key):
+        """(value, row) pairs for every live row, sorted by SORT_KEYS key."""
+        if key not in self.orders:
+            self.orders[key] = self._build_order(key)
+        elif key in self.orders_dirty:
+            self.orders[key].sort()
+            self.orders_dirty.discard(key)
+        return self.orders[key]
+
+    def _build_order(self, key):
+        value = sort_key(self, key)
+        return sorted((value(row), row) for row in self.rows())
+
+    def _order(self, row, keys):
+        for key in keys:
+            bisect.insort(self.order(key), (sort_key(self, key)(row), row))
+
+    def _unorder(self, row, keys):
+        for key in keys:
+            order = self.order(key)
+            del order[bisect.bisect_left(order, (sort_key(self, key)(row), row))]
+
+    def sorted_view(self, key="pct", reverse=False):
+        return OrderView(self.order(key), reverse)
+
+    # -----------------------------
+    # Column Operations
+    # -----------------------------
+    def _live_pct(self):
+        """Row numbers and percentages of live rows as NumPy arrays."""
+        mask = np.frombuffer(self.alive, dtype=np.bool_)
+        rows = np.flatnonzero(mask)
+        return rows, np.frombuffer(self.pct, dtype=np.float64)[rows]
+
+    def _argsort(self, reverse=False):
+        if _numpy() is not None:
+            rows, pct = self._live_pct()
+            # Negating keeps ties in file order, like a stable reverse sort.
+            return rows[np.argsort(-pct if reverse else pct, kind="stable")].tolist()
+        return sorted(self.rows(), key=self.pct.__getitem__, reverse=reverse)
+
+    def average(self):
+        return self.stats.average()
+
+    def grade_distribution(self):
+        return self.stats.grade_distribution()
+
+    def highest(self):
+        row = self.stats.highest()
+        return None if row is None else Student(self, row)
+
+    def lowest(self):
+        row = self.stats.lowest()
+        return None if row is None else Student(self, row)
+
+
+# -----------------------------
+# Live Aggregates
+# -----------------------------
+class StudentStats:
+    """Class summary figures kept up to date as a StudentTable changes.
+
+    The total is held in hundredths of a percent so it never drifts, the
+    highest and lowest rows come from heaps whose stale entries are only
+    thrown away when they reach the top, and the table's percentage
+    ordering answers median, percentile and top/bottom-k queries.
+    Every query returns None (or an empty list) for an empty table.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.rebuild()
+
+    def rebuild(self):
+        t = self.table
+        rows = list(t.rows())
+        self.total = sum(round(t.pct[r] * 100) for r in rows)
+        self.grade_counts = dict.fromkeys("ABCDF", 0)
+        for r in rows:
+            self.grade_counts[chr(t.grades[r])] += 1
+        # Ties go to the row nearest the top of the file, like min()/max().
+        self.max_heap = [(-t.pct[r], r) for r in rows]
+        self.min_heap = [(t.pct[r], r) for r in rows]
+        heapq.heapify(self.max_heap)
+        heapq.heapify(self.min_heap)
+
+    # -----------------------------
+    # Table Hooks
+    # -----------------------------
+    def added(self, row):
+        pct = self.table.pct[row]
+        self.total += round(pct * 100)
+        self.grade_counts[chr(self.table.grades[row])] += 1
+        heapq.heappush(self.max_heap, (-pct, row))
+        heapq.heappush(self.min_heap, (pct, row))
+
+    def added_range(self, start, stop):
+        t = self.table
+        for r in range(start, stop):
+            pct = t.pct[r]
+            self.total += round(pct * 100)
+            self.grade_counts[chr(t.grades[r])] += 1
+            heapq.heappush(self.max_heap, (-pct, r))
+            heapq.heappush(self.min_heap, (pct, r))
+
+    def removed(self, row):
+        pct = self.table.pct[row]
+        self.total -= round(pct * 100)
+        self.grade_counts[chr(self.table.grades[row])] -= 1
+        self._trim_heaps()
+
+    def changed(self, row, old_pct, old_grade):
+        pct = self.table.pct[row]
+        self.total += round(pct * 100) - round(old_pct * 100)
+        self.grade_counts[chr(old_grade)] -= 1
+        self.grade_counts[chr(self.table.grades[row])] += 1
+        heapq.heappush(self.max_heap, (-pct, row))
+        heapq.heappush(self.min_heap, (pct, row))
+        self._trim_heaps()
+
+    def _sorted(self):
+        return self.table.order("pct")
+
+    def _trim_heaps(self):
+        if len(self.min_heap) > 2 * self.table.size + 1024:
+            t = self.table
+            self.max_heap = [(-t.pct[r], r) for r in t.rows()]
+            self.min_heap = [(t.pct[r], r) for r in t.rows()]
+            heapq.heapify(self.max_heap)
+            heapq.heapify(self.min_heap)
+
+    def _peek(self, heap, sign):
+        """Top row of a heap, discarding entries for deleted or changed rows."""
+        t = self.table
+        while heap:
+            key, row = heap[0]
+            if t.alive[row] and t.pct[row] == sign * key:
+                return row
+            heapq.heappop(heap)
+        return None
+
+    # -----------------------------
+    # Queries
+    # -----------------------------
+    def count(self):
+        return self.table.size
+
+    def average(self):
+        return self.total / 100 / self.table.size if self.table.size else None
+
+    def highest(self):
+        return self._peek(self.max_heap, -1)
+
+    def lowest(self):
+        return self._peek(self.min_heap, 1)
+
+    def median(self):
+        by_pct = self._sorted()
+        n = len(by_pct)
+        if not n:
+            return None
+        if n % 2:
+            return by_pct[n // 2][0]
+        return round((by_pct[n // 2 - 1][0] + by_pct[n // 2][0]) / 2, 2)
+
+    def percentile(self, p):
+        """Overall percentage at the p-th percentile (nearest rank)."""
+        by_pct = self._sorted()
+        if not by_pct:
+            return None
+        rank = min(len(by_pct) - 1, max(0, int(round(p / 100 * len(by_pct))) - 1))
+        return by_pct[rank][0]
+
+    def top(self, k):
+        """Rows of the k best students, best first."""
+        return [row for _, row in reversed(self._sorted()[-k:])] if k > 0 else []
+
+    def bottom(self, k):
+        """Rows of the k weakest students, weakest first."""
+        return [row for _, row in self._sorted()[:k]]
+
+    def grade_distribution(self):
+        return dict(self.grade_counts)
+
+
+# -----------------------------
+# Ordering
+# -----------------------------
+SORT_KEYS = ("name", "code", "coursework", "exam", "pct", "grade")
+
+
+def sort_key(table, key):
+    """Function giving the value of one of SORT_KEYS for a row number."""
+    if key == "coursework":
+        c1, c2, c3 = table.c1, table.c2, table.c3
+        return lambda r: c1[r] + c2[r] + c3[r]
+    if key == "name":
+        names = table.names
+        return lambda r: names[r].casefold()
+    if key == "code":
+        return table.codes.__getitem__
+    if key == "grade":
+        return table.grades.__getitem__  # letter bytes, so "A" sorts first
+    return getattr(table, key).__getitem__
+
+
+def sorted_rows(table, key="pct", reverse=False):
+    """Live row numbers of table ordered by key.
+
+    StudentTable answers from its maintained ordering without sorting;
+    other tables (such as a mapped .smb file) are sorted on the spot.
+    """
+    if isinstance(table, StudentTable):
+        return table.sorted_view(key, reverse)
+    return sorted(table.rows(), key=sort_key(table, key), reverse=reverse)
+
+
+class OrderView:
+    """Row numbers of a sorted ordering, walked forwards or backwards.
+
+    Indexing and slicing cost only the rows asked for. Descending views
+    walk the ordering backwards, so ties come out in reverse file order.
+    """
+
+    def __init__(self, pairs, reverse=False):
+        self.pairs = pairs
+        self.reverse = reverse
+
+    def __len__(self):
+        return len(self.pairs)
+
+    def __getitem__(self, i):
+        n = len(self.pairs)
+        if isinstance(i, slice):
+            return [self.pairs[j if not self.reverse else n - 1 - j][1]
+                    for j in range(*i.indices(n))]
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("OrderView index out of range")
+        return self.pairs[n - 1 - i if self.reverse else i][1]
+
+
+def _index_remove(index, key, row):
+    rows = index[key]
+    rows.remove(row)
+    if not rows:
+        del index[key]
+
+
+def _take_column(column, order):
+    if _numpy() is not None:
+        picked = np.frombuffer(column, dtype=column.typecode)[order]
+        result = array(column.typecode)
+        result.frombytes(picked.tobytes())
+        return result
+    return array(column.typecode, map(column.__getitem__, order))
@@ -0,0 +1,165 @@
+"""Rounded rectangles and bars drawn as cached image sprites.
+
+Both apps used to build each rounded shape out of canvas items (a smoothed
+polygon per button, two ovals and a rectangle per bar) and redo that work
+on hover and on every redraw. Here each shape is rendered once per
+(size, radius, colour, background) into a PhotoImage, with anti-aliased
+corners blended into the background, and shared by every widget that
+needs it. Pixels wholly outside the corners are left transparent, so
+whatever is underneath shows through:
+
+    image = rounded_sprite(canvas, 150, 40, 20, "#1abc9c", canvas["bg"])
+    canvas.create_image(0, 0, image=image, anchor="nw")
+
+The cache keeps the KEEP most recently used sprites. Evicting a sprite
+does not remove it from widgets already showing it, as long as they keep
+their own reference (Tk drops an image once Python forgets it).
+"""
+import tkinter as tk
+from collections import OrderedDict
+from functools import lru_cache
+
+KEEP = 128     # sprites kept in the cache, least recently used dropped first
+SUBPIXELS = 4  # corner coverage is sampled on a SUBPIXELS x SUBPIXELS grid
+
+# ================= Rendering ================= #
+
+@lru_cache(maxsize=None)
+def corner_coverage(radius):
+    """Coverage 0..1 of each pixel in a radius x radius top-left corner."""
+    rows = []
+    for y in range(radius):
+        row = []
+        for x in range(radius):
+            inside = 0
+            for j in range(SUBPIXELS):
+                dy = radius - (y + (j + 0.5) / SUBPIXELS)
+                for i in range(SUBPIXELS):
+                    dx = radius - (x + (i + 0.5) / SUBPIXELS)
+                    inside += dx * dx + dy * dy <= radius * radius
+            row.append(inside / SUBPIXELS ** 2)
+        rows.append(row)
+    return rows
+
+def blend(fill, bg, amount):
+    return "#" + "".join(f"{round(b + (f - b) * amount):02x}" for f, b in zip(fill, bg))
+
+def sprite_rows(width, height, radius, fill, bg):
+    """Pixel rows of a rounded rectangle as PhotoImage.put data.
+
+    fill and bg are (r, g, b) tuples of 0-255; radius is clamped so the
+    corners never overlap.
+    """
+    radius = max(min(radius, width // 2, height // 2), 0)
+    coverage = corner_coverage(radius)
+    colors = {}
+
+    def color(amount):
+        if amount not in colors:
+            colors[amount] = blend(fill, bg, amount)
+        return colors[amount]
+
+    middle = " ".join([color(1.0)] * (width - 2 * radius))
+    full = "{" + " ".join([color(1.0)] * width) + "}"
+    rows = []
+    for y in range(height):
+        edge = y if y < radius else height - 1 - y if y >= height - radius else None
+        if edge is None:
+            rows.append(full)
+            continue
+        left = [color(amount) for amount in coverage[edge]]
+        rows.append("{" + " ".join(filter(None, (" ".join(left), middle, " ".join(reversed(left))))) + "}")
+    return " ".join(rows)
+
+def clear_pixels(width, height, radius):
+    """(x, y) of the pixels a rounded rectangle does not touch at all."""
+    radius = max(min(radius, width // 2, height // 2), 0)
+    coverage = corner_coverage(radius)
+    for edge in range(radius):
+        for x, amount in enumerate(coverage[edge]):
+            if amount:
+                break
+            for y in {edge, height - 1 - edge}:
+                yield x, y
+                yield width - 1 - x, y
+
+# ================= Sprite Cache ================= #
+
+class SpriteCache:
+    """LRU of rendered sprites, keyed by Tk interpreter and shape."""
+
+    def __init__(self, keep=KEEP):
+        self.keep = keep
+        self.sprites = OrderedDict()
+        self.rendered = 0
+
+    def get(self, master, width, height, radius, fill, bg):
+        key = (id(master.tk), width, height, radius, fill, bg)
+        if key in self.sprites:
+            self.sprites.move_to_end(key)
+            return self.sprites[key]
+        image = tk.PhotoImage(master=master, width=width, height=height)
+        if width > 0 and height > 0:
+            image.put(sprite_rows(width, height, radius, rgb(master, fill), rgb(master, bg)))
+            for x, y in clear_pixels(width, height, radius):
+                image.transparency_set(x, y, True)
+        self.rendered += 1
+        self.sprites[key] = image
+        while len(self.sprites) > self.keep:
+            self.sprites.popitem(last=False)
+        return image
+
+def rgb(master, color):
+    """8-bit channels of a colour name or #rrggbb."""
+    if len(color) == 7 and color.startswith("#"):
+        return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+    return tuple(channel >> 8 for channel in master.winfo_rgb(color))
+
+sprites = SpriteCache()
+
+def rounded_sprite(master, width, height, radius, fill, bg):
+    """Shared PhotoImage of a rounded rectangle; keep a reference while it is shown."""
+    return sprites.get(master, width, height, radius, fill, bg)
+
+# ================= Bars ================= #
+
+class RoundedBar:
+    """A pill-shaped bar of any width on a canvas, as one image item.
+
+    The bar at full width is a cached sprite per colour. A shorter bar is
+    copied into the bar's own image from the sprite's left part and its
+    right cap, which Tk does in C, so resizing never renders anything.
+    bg is the colour under the bar (the trough's, for a bar drawn over
+    one) that the anti-aliased edges are blended into.
+    """
+
+    def __init__(self, canvas, x, y, width, height, fill, bg="#ffffff", value=None):
+        self.canvas = canvas
+        self.width = width
+        self.height = height
+        self.radius = height // 2
+        self.bg = bg
+        self.image = tk.PhotoImage(master=canvas, width=width, height=height)
+        self.item = canvas.create_image(x, y, image=self.image, anchor="nw")
+        self.shown = (None, None)
+        self.set(width if value is None else value, fill)
+
+    def set(self, value=None, fill=None):
+        """Redraw at value pixels wide and/or in a new colour."""
+        value = self.shown[0] if value is None else max(min(int(value), self.width), 0)
+        fill = fill or self.shown[1]
+        if (value, fill) == self.shown:
+            return
+        self.shown = (value, fill)
+        sprite = rounded_sprite(self.canvas, self.width, self.height, self.radius, fill, self.bg)
+        self.image.blank()
+        # Below two caps' worth, show half of each cap so it still shrinks to nothing.
+        cap = min(self.radius, value // 2)
+        if value - cap > 0:
+            self._copy(sprite, 0, value - cap, 0)
+        if cap:
+            self._copy(sprite, self.width - cap, self.width, value - cap)
+
+    def _copy(self, sprite, left, right, to):
+        self.image.tk.call(self.image.name, "copy", sprite.name,
+                           "-from", left, 0, right, self.height, "-to", to, 0)
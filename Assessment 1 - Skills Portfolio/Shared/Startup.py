@@ -0,0 +1,166 @@
+"""Startup pipeline for the tkinter apps: first frame first, the rest after.
+
+Each app imports this module before anything else, builds just enough UI
+to show, and hands the slow parts (decoding images, opening data files)
+to after_first_frame, which runs them one per event-loop turn once the
+window is on screen.
+
+With --profile-startup, module imports are timed as they happen (the same
+self/cumulative split as python -X importtime), and once the deferred
+steps have run a report is printed to stderr:
+
+    python Jokes.py --profile-startup
+
+Time to first frame is measured from when this module was imported and
+checked against BUDGET_MS.
+"""
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+BUDGET_MS = 400        # cold start budget for time to first frame
+FALLBACK_MS = 1000     # run deferred steps anyway if the window never maps
+
+started = time.perf_counter()
+startup_cpu = time.process_time()  # interpreter start-up before this module
+profiling = "--profile-startup" in sys.argv
+
+imports = []      # (depth, name, self seconds, cumulative seconds), in finishing order
+phases = []       # (name, started, seconds)
+first_frame = None
+
+# ================= Import Timing ================= #
+
+class _TimedLoader:
+    """Wraps a module's loader to time creating and running it.
+
+    Only imports on the main thread are timed; worker threads importing
+    in the background do not hold up the window.
+    """
+
+    stack = []  # [started, seconds spent in nested imports] per import in progress
+
+    def __init__(self, loader, name):
+        self.loader = loader
+        self.name = name
+
+    def __getattr__(self, attr):
+        return getattr(self.loader, attr)
+
+    def timed(self):
+        return threading.get_ident() == threading.main_thread().ident
+
+    def create_module(self, spec):
+        create = getattr(self.loader, "create_module", None)
+        if not self.timed():
+            return create(spec) if create else None
+        self.stack.append([time.perf_counter(), 0.0])
+        try:
+            return create(spec) if create else None
+        except BaseException:
+            self.stack.pop()
+            raise
+
+    def exec_module(self, module):
+        # Put the real loader back first, so nothing later sees the wrapper.
+        module.__loader__ = self.loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self.loader
+        if not self.timed():
+            self.loader.exec_module(module)
+            return
+        try:
+            self.loader.exec_module(module)
+        finally:
+            begun, nested = self.stack.pop()
+            seconds = time.perf_counter() - begun
+            if self.stack:
+                self.stack[-1][1] += seconds
+            imports.append((len(self.stack), self.name, seconds - nested, seconds))
+
+class _ImportTimer:
+    """Meta path finder that hands every other finder's spec a timed loader."""
+
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, name)
+                return spec
+        return None
+
+if profiling:
+    sys.meta_path.insert(0, _ImportTimer())
+
+# ================= Deferred Steps ================= #
+
+def ms(seconds):
+    return seconds * 1000
+
+@contextmanager
+def phase(name):
+    """Time a named step of startup for the report."""
+    begun = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases.append((name, begun, time.perf_counter() - begun))
+
+def after_first_frame(root, *steps):
+    """Run (name, func) steps one per loop turn once root has been drawn."""
+    state = {"done": False}
+
+    def mapped(event=None):
+        if event is not None and event.widget is not root or state["done"]:
+            return
+        state["done"] = True
+        root.after(0, painted)
+
+    def painted():
+        global first_frame
+        root.update_idletasks()  # flush the pending redraws: the frame is on screen
+        first_frame = time.perf_counter()
+        run(0)
+
+    def run(i):
+        if i == len(steps):
+            if profiling:
+                print(report(), file=sys.stderr)
+            return
+        name, func = steps[i]
+        try:
+            with phase(name):
+                func()
+        finally:
+            root.after(1, run, i + 1)
+
+    root.bind("<Map>", mapped, add="+")
+    root.after(FALLBACK_MS, mapped)
+
+# ================= Report ================= #
+
+def report(limit=10):
+    lines = [f"Startup (budget {BUDGET_MS} ms to first frame)",
+             f"  interpreter start-up (CPU)   {ms(startup_cpu):8.1f} ms"]
+    if imports:
+        total = sum(seconds for depth, _, _, seconds in imports if depth == 0)
+        lines.append(f"  imports after Startup        {ms(total):8.1f} ms  ({len(imports)} modules)")
+        lines.append(f"  {'self ms':>9} {'cumul ms':>9}  slowest top-level imports")
+        top = sorted((item for item in imports if item[0] == 0), key=lambda item: item[3], reverse=True)
+        for _, name, own, seconds in top[:limit]:
+            lines.append(f"  {ms(own):>9.1f} {ms(seconds):>9.1f}  {name}")
+    for name, begun, seconds in phases:
+        when = "after first frame" if first_frame is not None and begun >= first_frame else "before first frame"
+        lines.append(f"  {name:<28} {ms(seconds):8.1f} ms  ({when})")
+    if first_frame is not None:
+        to_frame = ms(first_frame - started)
+        verdict = "ok" if to_frame <= BUDGET_MS else f"OVER BUDGET by {to_frame - BUDGET_MS:.0f} ms"
+        lines.append(f"  time to first frame          {to_frame:8.1f} ms  {verdict}")
+        if phases:
+            name, begun, seconds = phases[-1]
+            lines.append(f"  all deferred steps done      {ms(begun + seconds - started):8.1f} ms")
+    return "\n".join(lines)
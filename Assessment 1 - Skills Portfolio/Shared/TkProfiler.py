@@ -0,0 +1,173 @@
+"""Opt-in event-loop profiler for the tkinter apps.
+
+Each app turns it on with --profile-trace <file>:
+
+    python "Math Quiz.py" --profile-trace quiz-trace.json
+
+Every Tk callback (button commands, bindings, after jobs) is timed, after
+jobs also record how late they fired, and a heartbeat measures how long
+the loop takes to get back to idle. If a callback runs longer than
+SLOW_MS, the main thread's stack is sampled while it is still running.
+On exit everything is written as a Chrome trace: open chrome://tracing or
+https://ui.perfetto.dev and load the file. A summary of the slowest
+callbacks is printed to stderr.
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+import tkinter as tk
+
+SLOW_MS = 50       # sample stacks of callbacks running longer than this
+SAMPLE_MS = 10     # how often to check for a slow callback
+RESAMPLE_MS = 100  # then how often to keep sampling the same one
+HEARTBEAT_MS = 50  # how often the loop lag is measured
+
+def callback_name(func):
+    name = getattr(func, "__qualname__", None) or getattr(func, "__name__", None) or repr(func)
+    owner = getattr(func, "__self__", None)
+    if owner is not None and "." not in name:
+        name = f"{type(owner).__name__}.{name}"
+    return name
+
+class TkProfiler:
+    def __init__(self, path):
+        self.path = path
+        self.pid = os.getpid()
+        self.main_thread = threading.get_ident()
+        self.origin = time.perf_counter()
+        self.events = []
+        self.totals = {}  # name -> [calls, total seconds, worst seconds]
+        self.running = []  # stack of (name, started) for nested callbacks
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def us(self, moment):
+        return round((moment - self.origin) * 1e6, 1)
+
+    # ================= Hooks ================= #
+
+    def install(self, root):
+        profiler = self
+        original_call = tk.CallWrapper.__call__
+        original_after = tk.Misc.after
+
+        def call(wrapper, *args):
+            if getattr(wrapper.func, "profiled", False):
+                return original_call(wrapper, *args)
+            return profiler.timed(callback_name(wrapper.func), original_call, wrapper, *args)
+
+        def after(widget, ms, func=None, *args):
+            if func is None:
+                return original_after(widget, ms)
+            # Same as Misc.after, but the job is timed under func's own name.
+            name = callback_name(func)
+            due = time.perf_counter() + (0 if ms == "idle" else ms / 1000)
+
+            def callit():
+                try:
+                    profiler.lag(time.perf_counter() - due)
+                    profiler.timed(name, func, *args)
+                finally:
+                    try:
+                        widget.deletecommand(command)
+                    except tk.TclError:
+                        pass
+            callit.profiled = True
+            command = widget._register(callit)
+            return widget.tk.call("after", ms, command)
+
+        tk.CallWrapper.__call__ = call
+        tk.Misc.after = after
+        threading.Thread(target=self.sample, daemon=True, name="tk-profiler").start()
+        self.heartbeat(root)
+        atexit.register(self.write)
+
+    def timed(self, name, func, *args):
+        started = time.perf_counter()
+        with self.lock:
+            self.running.append((name, started))
+        try:
+            return func(*args)
+        finally:
+            ended = time.perf_counter()
+            with self.lock:
+                self.running.pop()
+            self.complete(name, started, ended)
+
+    def complete(self, name, started, ended):
+        seconds = ended - started
+        self.events.append({"name": name, "ph": "X", "ts": self.us(started), "dur": round(seconds * 1e6, 1),
+                            "pid": self.pid, "tid": self.main_thread, "cat": "callback"})
+        calls = self.totals.setdefault(name, [0, 0.0, 0.0])
+        calls[0] += 1
+        calls[1] += seconds
+        calls[2] = max(calls[2], seconds)
+
+    def lag(self, seconds, name="after lag"):
+        self.events.append({"name": name, "ph": "C", "ts": self.us(time.perf_counter()),
+                            "pid": self.pid, "args": {"ms": round(max(seconds, 0) * 1000, 3)}})
+
+    def heartbeat(self, root):
+        """Measure loop lag even when the app itself schedules nothing."""
+        due = time.perf_counter() + HEARTBEAT_MS / 1000
+
+        def beat():
+            root.deletecommand(command)
+            self.lag(time.perf_counter() - due, "loop lag")
+            self.heartbeat(root)
+        beat.profiled = True
+        try:
+            command = root._register(beat)
+            root.tk.call("after", HEARTBEAT_MS, command)
+        except tk.TclError:
+            pass  # window already destroyed
+
+    def sample(self):
+        """Background thread: snapshot the stack of any long-running callback."""
+        last = 0.0
+        while not self.stopped.wait(SAMPLE_MS / 1000):
+            with self.lock:
+                if not self.running:
+                    continue
+                name, started = self.running[-1]
+            now = time.perf_counter()
+            if now - started < SLOW_MS / 1000 or now - last < RESAMPLE_MS / 1000:
+                continue
+            frame = sys._current_frames().get(self.main_thread)
+            if frame is None:
+                continue
+            last = now
+            stack = [f"{f.filename}:{f.lineno} {f.name}" for f in traceback.extract_stack(frame)
+                     if os.path.basename(f.filename) != "TkProfiler.py"
+                     and os.path.basename(os.path.dirname(f.filename)) != "tkinter"]
+            self.events.append({"name": f"slow: {name}", "ph": "i", "s": "t", "ts": self.us(now),
+                                "pid": self.pid, "tid": self.main_thread, "cat": "sample",
+                                "args": {"running_ms": round((now - started) * 1000, 1), "stack": stack}})
+
+    # ================= Output ================= #
+
+    def write(self):
+        self.stopped.set()
+        events = [{"name": "thread_name", "ph": "M", "pid": self.pid, "tid": self.main_thread,
+                   "args": {"name": "Tk main loop"}}] + self.events
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
+        print(self.summary(), file=sys.stderr)
+
+    def summary(self, limit=15):
+        rows = sorted(self.totals.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        lines = [f"Tk callbacks by total time (trace: {self.path})",
+                 f"{'calls':>7} {'total ms':>10} {'worst ms':>10}  callback"]
+        for name, (calls, total, worst) in rows:
+            lines.append(f"{calls:>7} {total * 1000:>10.1f} {worst * 1000:>10.1f}  {name}")
+        return "\n".join(lines)
+
+def install(root, path):
+    """Start profiling every callback of root's Tk; the trace is written at exit."""
+    profiler = TkProfiler(path)
+    profiler.install(root)
+    return profiler